@@ -25,4 +25,27 @@ merged_df.to_csv("data/cleaned_aqi_with_coords.csv", index=False)
 
 print("✅ Coordinates added successfully.")
 print("New Shape:", merged_df.shape)
-print(merged_df[['state', 'city', 'latitude', 'longitude']].head())
\ No newline at end of file
+print(merged_df[['state', 'city', 'latitude', 'longitude']].head())
+
+
+# ==========================
+# STATION COORDINATES
+# ==========================
+# Station-level rows keep each station's own location
+# (large cities have many stations kilometres apart).
+station_coords = raw_df[['state', 'city', 'station', 'latitude', 'longitude']]
+station_coords = station_coords.drop_duplicates(subset=['state', 'city', 'station'])
+
+stations_df = pd.read_csv("data/cleaned_aqi_station_data.csv")
+
+stations_df = pd.merge(
+    stations_df,
+    station_coords,
+    on=['state', 'city', 'station'],
+    how='left'
+)
+
+stations_df.to_csv("data/cleaned_aqi_stations.csv", index=False)
+
+print("\n✅ Station coordinates added successfully.")
+print("Station Shape:", stations_df.shape)
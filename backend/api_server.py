@@ -0,0 +1,426 @@
+"""
+Local JSON API over the pipeline for internal services.
+
+    python -m backend.api_server --port 8080
+
+    GET /alerts?state=Delhi&wind_direction=90&wind_strength=0.3&scenario=Normal%20Conditions
+    GET /spread, /projection, /urban-rural (same parameters), /health
+
+Responses carry an ETag; clients sending it back in If-None-Match get
+304 Not Modified while the data and parameters are unchanged.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import sys
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import numpy as np
+
+from backend.pipeline import (
+    DATA_PATH,
+    SCENARIO_MULTIPLIERS,
+    available_states,
+    dataset_version,
+    load_dataset,
+    run_pipeline
+)
+from utils.compact_frame import enable_copy_on_write
+from utils.pipeline_cache import StageCache
+
+DEFAULT_PARAMS = {
+    "state": "All",
+    "wind_direction": 90.0,
+    "wind_strength": 0.3,
+    "scenario": "Normal Conditions",
+}
+
+SPREAD_COLUMNS = [
+    "state", "city", "station", "latitude", "longitude",
+    "severity_index", "spread_impact", "predicted_severity", "severity_label"
+]
+
+PROJECTION_COLUMNS = [
+    "state", "city", "station", "risk_momentum", "momentum_level",
+    "projected_7day_severity", "projected_7day_lower", "projected_7day_upper",
+    "projected_alert"
+]
+
+MAX_HEADER_LINES = 100
+
+# Seconds a dataset version / state list is reused before re-checking
+DATASET_TTL = 2.0
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ==========================
+# REQUEST PARAMETERS
+# ==========================
+def _number(query, name, low, high):
+    raw = query.get(name, [None])[-1]
+    if raw is None:
+        return DEFAULT_PARAMS[name]
+
+    try:
+        value = float(raw)
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} must be a number")
+
+    if not low <= value <= high:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} must be between {low} and {high}")
+
+    return value
+
+
+def parse_params(query, states):
+    """
+    Validated pipeline parameters from a parsed query string
+    (urllib.parse.parse_qs); missing ones take DEFAULT_PARAMS.
+
+    Wind is snapped to the dashboard's steps (1 degree, 0.1 strength),
+    so nearby values share one cache entry and the echoed parameters
+    match the result.
+    """
+    state = query.get("state", [DEFAULT_PARAMS["state"]])[-1]
+    if state != "All" and state not in states:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"Unknown state: {state}")
+
+    scenario = query.get("scenario", [DEFAULT_PARAMS["scenario"]])[-1]
+    if scenario not in SCENARIO_MULTIPLIERS:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"Unknown scenario: {scenario}")
+
+    return {
+        "state": state,
+        "wind_direction": float(round(_number(query, "wind_direction", 0, 360)) % 360),
+        "wind_strength": round(_number(query, "wind_strength", 0, 1), 1),
+        "scenario": scenario,
+    }
+
+
+# ==========================
+# ENDPOINT PAYLOADS
+# ==========================
+def _records(df, columns):
+    present = [column for column in columns if column in df.columns]
+    # to_json writes NaN as null
+    return json.loads(df[present].to_json(orient="records", double_precision=6))
+
+
+def alerts_payload(result):
+    alerts = result["alerts"]
+    return {"reliability": result["reliability"], "alerts": _records(alerts, list(alerts.columns))}
+
+
+def spread_payload(result):
+    return {"source": result["source"], "stations": _records(result["frame"], SPREAD_COLUMNS)}
+
+
+def projection_payload(result):
+    return {"projections": _records(result["frame"], PROJECTION_COLUMNS)}
+
+
+def urban_rural_payload(result):
+    comparison = result["comparison"]
+    return {"comparison": _records(comparison, list(comparison.columns))}
+
+
+ENDPOINTS = {
+    "/alerts": alerts_payload,
+    "/spread": spread_payload,
+    "/projection": projection_payload,
+    "/urban-rural": urban_rural_payload,
+}
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def encode_json(payload):
+    body = json.dumps(payload, default=_json_default, separators=(",", ":")).encode()
+    etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+    return body, etag
+
+
+# ==========================
+# SERVICE
+# ==========================
+class ApiService:
+    """
+    Answers endpoint requests from a response cache keyed on (endpoint,
+    parameters, dataset version). On a miss the pipeline runs in a worker
+    thread; identical requests arriving while it runs wait for that one
+    computation instead of starting their own, and every endpoint for
+    the same parameters shares it (they read one run_pipeline result).
+
+    Dataset checks and JSON encoding run on their own small executor,
+    so cached requests are not queued behind pipeline runs.
+    """
+
+    def __init__(self, data_path=DATA_PATH, max_workers=4, cache_size=512, io_workers=2):
+        self.data_path = data_path
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.io_executor = ThreadPoolExecutor(max_workers=io_workers)
+        self.responses = StageCache(maxsize=cache_size)
+        self.computations = 0
+        self._computations_lock = threading.Lock()
+        self._inflight = {}
+        self._dataset = None
+        self._dataset_checked = 0.0
+
+    def _run(self, params):
+        df = load_dataset(
+            self.data_path,
+            state=None if params["state"] == "All" else params["state"],
+            compact=True
+        )
+
+        with self._computations_lock:
+            self.computations += 1
+
+        return run_pipeline(
+            df,
+            wind_direction=params["wind_direction"],
+            wind_strength=params["wind_strength"],
+            scenario=params["scenario"],
+            sweep=True
+        )
+
+    async def _result(self, key, params):
+        task = self._inflight.get(key)
+
+        if task is None:
+            loop = asyncio.get_running_loop()
+            task = asyncio.ensure_future(loop.run_in_executor(self.executor, self._run, params))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # Shielded: one client disconnecting must not cancel the others
+        return await asyncio.shield(task)
+
+    def _check_dataset(self):
+        return dataset_version(self.data_path), available_states(self.data_path)
+
+    async def _dataset_info(self):
+        """
+        (dataset version, states), re-checked in an I/O thread (the
+        store version walks its files) at most every DATASET_TTL
+        seconds; concurrent requests share one check.
+        """
+        task = self._dataset
+        expired = time.monotonic() - self._dataset_checked > DATASET_TTL
+
+        if task is None or (task.done() and (expired or task.exception() is not None)):
+            loop = asyncio.get_running_loop()
+            task = asyncio.ensure_future(loop.run_in_executor(self.io_executor, self._check_dataset))
+            self._dataset = task
+            self._dataset_checked = time.monotonic()
+
+        return await asyncio.shield(task)
+
+    async def response(self, path, query):
+        """
+        (body, etag) for an endpoint request; raises ApiError.
+        """
+        if path not in ENDPOINTS:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Unknown endpoint: {path}")
+
+        version, states = await self._dataset_info()
+        params = parse_params(query, states)
+
+        pipeline_key = (tuple(sorted(params.items())), version)
+        response_key = (path, pipeline_key)
+
+        cached = self.responses.get(response_key)
+        if cached is not None:
+            return cached
+
+        result = await self._result(pipeline_key, params)
+        if result is None:
+            raise ApiError(HTTPStatus.UNPROCESSABLE_ENTITY, "Not enough valid data for this selection")
+
+        # Serializing a nationwide frame takes a while; keep it off the loop
+        cached = await asyncio.get_running_loop().run_in_executor(
+            self.io_executor, lambda: encode_json(dict(params=params, **ENDPOINTS[path](result)))
+        )
+        self.responses.put(response_key, cached)
+
+        return cached
+
+    async def handle(self, method, target, headers):
+        """
+        (status, headers, body) for one HTTP request.
+        """
+        if method not in ("GET", "HEAD"):
+            return self._error(HTTPStatus.METHOD_NOT_ALLOWED, "Only GET is supported")
+
+        url = urllib.parse.urlsplit(target)
+
+        if url.path == "/health":
+            body, _ = encode_json({
+                "status": "ok",
+                "endpoints": list(ENDPOINTS),
+                "computations": self.computations,
+                "cached_responses": len(self.responses),
+            })
+            return HTTPStatus.OK, {"Content-Type": "application/json"}, body
+
+        try:
+            body, etag = await self.response(url.path, urllib.parse.parse_qs(url.query))
+        except ApiError as error:
+            return self._error(error.status, str(error))
+        except Exception as error:
+            print(f"⚠ api: {target} failed ({error!r})", file=sys.stderr)
+            return self._error(HTTPStatus.INTERNAL_SERVER_ERROR, "Pipeline failed")
+
+        response_headers = {
+            "Content-Type": "application/json",
+            "ETag": etag,
+            "Cache-Control": "no-cache",
+        }
+
+        matches = _etags(headers.get("if-none-match", ""))
+        if "*" in matches or etag in matches:
+            return HTTPStatus.NOT_MODIFIED, response_headers, b""
+
+        return HTTPStatus.OK, response_headers, b"" if method == "HEAD" else body
+
+    def _error(self, status, message):
+        body, _ = encode_json({"error": message})
+        return status, {"Content-Type": "application/json"}, body
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.io_executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _etags(header):
+    """
+    Entity tags listed in an If-None-Match header (weak tags compare
+    equal for GET).
+    """
+    return {tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()}
+
+
+# ==========================
+# HTTP/1.1 SERVER
+# ==========================
+async def _read_request(reader):
+    line = await reader.readline()
+    if not line:
+        return None
+
+    parts = line.decode("latin-1").split()
+    if len(parts) != 3:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+
+    headers = {}
+    for _ in range(MAX_HEADER_LINES):
+        header = await reader.readline()
+        if header in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = header.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise ApiError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Too many headers")
+
+    # GET requests carry no body we use; skip one if sent
+    length = int(headers.get("content-length", 0) or 0)
+    if length:
+        await reader.readexactly(length)
+
+    method, target, version = parts
+    return method, target, version, headers
+
+
+def _write_response(writer, status, headers, body, keep_alive):
+    lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+    headers = dict(headers, **{
+        "Content-Length": str(len(body)) if status != HTTPStatus.NOT_MODIFIED else "0",
+        "Connection": "keep-alive" if keep_alive else "close",
+    })
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+
+
+async def serve(service, host="127.0.0.1", port=8080):
+    """
+    Start the HTTP server (keep-alive connections, one task each).
+    """
+
+    async def connection(reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except ApiError as error:
+                    status, headers, body = service._error(error.status, str(error))
+                    _write_response(writer, status, headers, body, keep_alive=False)
+                    break
+
+                if request is None:
+                    break
+
+                method, target, version, headers = request
+                connection_header = headers.get("connection", "").lower()
+                keep_alive = connection_header == "keep-alive" or (
+                    version == "HTTP/1.1" and connection_header != "close"
+                )
+
+                status, response_headers, body = await service.handle(method, target, headers)
+                _write_response(writer, status, response_headers, body, keep_alive)
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(connection, host, port)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSON API for alerts, spread and projections")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--workers", type=int, default=4, help="pipeline worker threads")
+    parser.add_argument("--cache-size", type=int, default=512, help="cached responses")
+    args = parser.parse_args(argv)
+
+    enable_copy_on_write()
+    service = ApiService(args.data, max_workers=args.workers, cache_size=args.cache_size)
+
+    async def run():
+        server = await serve(service, args.host, args.port)
+        print(f"🌐 API listening on http://{args.host}:{args.port} ({', '.join(ENDPOINTS)})")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
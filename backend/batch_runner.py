@@ -0,0 +1,224 @@
+"""
+Headless batch runs of the full pipeline across a process pool.
+
+    python -m backend.batch_runner --output reports/nightly --all-scenarios --workers 8
+    python -m backend.batch_runner --output reports/stations --resolution station \
+        --timeseries data/aqi_timeseries_stations
+"""
+
+import argparse
+import itertools
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from backend.pipeline import (
+    DATA_PATH,
+    RESOLUTIONS,
+    SCENARIO_MULTIPLIERS,
+    available_states,
+    load_dataset,
+    load_timeseries,
+    run_pipeline
+)
+from utils.compact_frame import enable_copy_on_write
+from utils.resolution import CITY_KEY, STATION_KEY
+
+_worker_data_path = DATA_PATH
+_worker_resolution = "city"
+_worker_history = None
+
+
+def _init_worker(data_path, timeseries_path=None, resolution="city"):
+    global _worker_data_path, _worker_history, _worker_resolution
+    _worker_data_path = data_path
+    _worker_resolution = resolution
+    enable_copy_on_write()
+
+    # Workers map the same files, so the history is paged in once (OS cache)
+    if timeseries_path is not None:
+        _worker_history = load_timeseries(timeseries_path)
+
+
+def _slug(text):
+    return re.sub(r"[^a-z0-9]+", "_", str(text).lower()).strip("_")
+
+
+def run_state(state, runs, output_dir):
+    """
+    All runs for one state in one worker, so the cached stages up to
+    source estimation are computed once and reused by every scenario.
+    """
+    df = load_dataset(_worker_data_path, state=state, compact=True, resolution=_worker_resolution)
+
+    records = []
+
+    for run in runs:
+        start = time.perf_counter()
+        result = run_pipeline(df, history=_worker_history, resolution=_worker_resolution, **run)
+
+        record = dict(run, state=state, rows=len(df))
+
+        if result is None:
+            record.update(status="skipped", reason="no valid coordinates")
+        else:
+            folder = os.path.join(
+                output_dir,
+                _slug(state),
+                f"{_slug(run['scenario'])}__wd{run['wind_direction']}_ws{run['wind_strength']}"
+            )
+            os.makedirs(folder, exist_ok=True)
+
+            result["frame"].to_csv(os.path.join(folder, "predictions.csv"), index=False)
+            result["alerts"].to_csv(os.path.join(folder, "alerts.csv"), index=False)
+            result["comparison"].to_csv(os.path.join(folder, "urban_rural.csv"), index=False)
+
+            record.update(
+                status="ok",
+                path=folder,
+                reliability=float(result["reliability"]),
+                source_latitude=float(result["source"]["source_latitude"]),
+                source_longitude=float(result["source"]["source_longitude"])
+            )
+
+        record["seconds"] = round(time.perf_counter() - start, 4)
+        records.append(record)
+
+    return records
+
+
+def build_runs(scenarios, wind_directions, wind_strengths):
+    return [
+        {"scenario": scenario, "wind_direction": direction, "wind_strength": strength}
+        for scenario, direction, strength in itertools.product(
+            scenarios, wind_directions, wind_strengths
+        )
+    ]
+
+
+def run_batch(output_dir, states=None, scenarios=("Normal Conditions",),
+              wind_directions=(90,), wind_strengths=(0.3,),
+              workers=None, data_path=DATA_PATH, timeseries_path=None,
+              resolution="city"):
+    """
+    Run every (state, scenario, wind) combination and write the results
+    under output_dir, plus a summary.json describing every run.
+
+    resolution="station" runs on the station-level dataset (one result
+    row per station) instead of the city one.
+
+    timeseries_path (a build_store.py history store) fits the forecasts
+    on each city's (or station's) history instead of the constant growth
+    factor. Its series must match the resolution, since a mismatched
+    store has no history for any row.
+    """
+    if timeseries_path is not None:
+        history = load_timeseries(timeseries_path)
+        if history is None:
+            raise ValueError(f"No history store at {timeseries_path}")
+
+        expected = STATION_KEY if resolution == "station" else CITY_KEY
+        if list(history.key) != expected:
+            raise ValueError(
+                f"History store at {timeseries_path} is keyed by {history.key}, "
+                f"but {resolution} runs need {expected}"
+            )
+
+    for scenario in scenarios:
+        if scenario not in SCENARIO_MULTIPLIERS:
+            raise ValueError(f"Unknown scenario: {scenario}")
+
+    if states is None:
+        states = available_states(data_path)
+
+    runs = build_runs(scenarios, wind_directions, wind_strengths)
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    records = []
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(data_path, timeseries_path, resolution)
+    ) as pool:
+        futures = {
+            pool.submit(run_state, state, runs, output_dir): state
+            for state in states
+        }
+        for future in as_completed(futures):
+            state = futures[future]
+            try:
+                records.extend(future.result())
+            except Exception as error:
+                # One failing state (or a crashed worker) must not lose the rest
+                print(f"⚠ {state} failed ({error!r})", file=sys.stderr)
+                records.extend(
+                    dict(run, state=state, status="failed", reason=repr(error))
+                    for run in runs
+                )
+
+    records.sort(key=lambda r: (r["state"], r["scenario"], r["wind_direction"], r["wind_strength"]))
+
+    summary = {
+        "states": len(states),
+        "runs": len(records),
+        "workers": workers or os.cpu_count(),
+        "seconds": round(time.perf_counter() - start, 3),
+        "results": records
+    }
+
+    with open(os.path.join(output_dir, "summary.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the full pipeline for every state / scenario")
+    parser.add_argument("--output", required=True, help="directory for results")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--states", nargs="+", default=None, help="default: every state")
+    parser.add_argument("--scenarios", nargs="+", default=["Normal Conditions"])
+    parser.add_argument("--all-scenarios", action="store_true")
+    parser.add_argument("--wind-directions", type=float, nargs="+", default=[90])
+    parser.add_argument("--wind-strengths", type=float, nargs="+", default=[0.3])
+    parser.add_argument("--workers", type=int, default=None, help="default: one per CPU")
+    parser.add_argument("--timeseries", default=None, help="history store for fitted forecasts")
+    parser.add_argument("--resolution", choices=RESOLUTIONS, default="city",
+                        help="one result row per city (default) or per station")
+    args = parser.parse_args(argv)
+
+    scenarios = list(SCENARIO_MULTIPLIERS) if args.all_scenarios else args.scenarios
+
+    summary = run_batch(
+        args.output,
+        states=args.states,
+        scenarios=scenarios,
+        wind_directions=args.wind_directions,
+        wind_strengths=args.wind_strengths,
+        workers=args.workers,
+        data_path=args.data,
+        timeseries_path=args.timeseries,
+        resolution=args.resolution
+    )
+
+    skipped = [r for r in summary["results"] if r["status"] == "skipped"]
+    failed = [r for r in summary["results"] if r["status"] == "failed"]
+
+    print(f"✅ {summary['runs']} runs over {summary['states']} states in {summary['seconds']}s")
+    if skipped:
+        print(f"⚠ {len(skipped)} runs skipped (see summary.json)")
+    if failed:
+        print(f"❌ {len(failed)} runs failed (see summary.json)")
+
+    # Non-zero so schedulers notice a broken batch
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
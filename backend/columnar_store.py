@@ -0,0 +1,130 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+STORE_PATH = "data/aqi_store"
+
+COLUMNS = ['state', 'city', 'date', 'NO2', 'PM10', 'PM2.5', 'latitude', 'longitude']
+
+# Partition keys live in the directory names (state=.../month=YYYY-MM/).
+# Month rather than day keeps files a useful size; date-range filters
+# still skip row groups inside a month through Parquet statistics.
+PARTITIONING = ds.partitioning(
+    pa.schema([("state", pa.string()), ("month", pa.string())]),
+    flavor="hive"
+)
+
+FILE_SCHEMA = pa.schema([
+    ("city", pa.string()),
+    ("date", pa.date32()),
+    ("NO2", pa.float64()),
+    ("PM10", pa.float64()),
+    ("PM2.5", pa.float64()),
+    ("latitude", pa.float64()),
+    ("longitude", pa.float64()),
+])
+
+
+def load_station_coordinates(raw_path="data/AQI.csv", keys=('state', 'city')):
+    """
+    One lat/long per key from the raw export: per (state, city) by
+    default, per station with keys=('state', 'city', 'station').
+    """
+    keys = list(keys)
+    raw = pd.read_csv(raw_path, usecols=keys + ['latitude', 'longitude'])
+    return raw.drop_duplicates(subset=keys)
+
+
+def write_store(cleaned_df, coords_df, root=STORE_PATH):
+    """
+    Join coordinates and write the cleaned data as Parquet partitioned
+    by state and month. Only the partitions present in cleaned_df are
+    replaced, so incremental ingests rewrite just the touched months.
+    """
+    df = pd.merge(cleaned_df, coords_df, on=['state', 'city'], how='left')
+
+    df['date'] = pd.to_datetime(df['date']).dt.date
+    df['month'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m')
+    df = df.sort_values(['state', 'month', 'city', 'date'])
+
+    schema = FILE_SCHEMA.append(pa.field("state", pa.string())).append(pa.field("month", pa.string()))
+    table = pa.Table.from_pandas(df[schema.names], schema=schema, preserve_index=False)
+
+    ds.write_dataset(
+        table,
+        root,
+        format="parquet",
+        partitioning=PARTITIONING,
+        existing_data_behavior="delete_matching"
+    )
+
+    return len(df)
+
+
+def open_store(root=STORE_PATH):
+    return ds.dataset(root, format="parquet", partitioning=PARTITIONING)
+
+
+def store_exists(root=STORE_PATH):
+    return os.path.isdir(root) and any(os.scandir(root))
+
+
+def store_version(root=STORE_PATH):
+    """
+    Latest modification time of any file in the store (cache key).
+    """
+    latest = 0.0
+    for folder, _, files in os.walk(root):
+        for name in files:
+            latest = max(latest, os.path.getmtime(os.path.join(folder, name)))
+    return latest
+
+
+def list_states(root=STORE_PATH):
+    """
+    States available in the store, read from partition paths only.
+    """
+    states = set()
+    for fragment in open_store(root).get_fragments():
+        keys = ds.get_partition_keys(fragment.partition_expression)
+        states.add(keys["state"])
+    return sorted(states)
+
+
+def load_store(root=STORE_PATH, states=None, start=None, end=None, columns=None):
+    """
+    Read only the requested states / date range / columns.
+    start and end are inclusive dates (anything pd.Timestamp accepts).
+    """
+    dataset = open_store(root)
+
+    filters = []
+
+    if states is not None:
+        if isinstance(states, str):
+            states = [states]
+        filters.append(ds.field("state").isin(list(states)))
+
+    if start is not None:
+        start = pd.Timestamp(start)
+        filters.append(ds.field("month") >= start.strftime('%Y-%m'))
+        filters.append(ds.field("date") >= pa.scalar(start.date(), pa.date32()))
+
+    if end is not None:
+        end = pd.Timestamp(end)
+        filters.append(ds.field("month") <= end.strftime('%Y-%m'))
+        filters.append(ds.field("date") <= pa.scalar(end.date(), pa.date32()))
+
+    expression = None
+    for condition in filters:
+        expression = condition if expression is None else expression & condition
+
+    columns = COLUMNS if columns is None else list(columns)
+
+    table = dataset.to_table(columns=columns, filter=expression)
+
+    df = table.to_pandas(date_as_object=False)
+
+    return df.sort_values([c for c in ['state', 'city', 'date'] if c in df.columns]).reset_index(drop=True)
@@ -1,29 +1,36 @@
 import numpy as np
 
-def project_7day_impact(df):
+from simulation.advection_diffusion import dynamics_growth
+from utils.banding import PROJECTION_BANDS, assign_bands, classify_band
+
+def project_7day_impact(df, dynamics=None):
 
     if "risk_momentum" not in df.columns:
         return df
 
-    # Simulated daily growth rate
-    daily_growth = 0.03  # 3% compounding
+    if dynamics is not None:
+        # Growth from 7 days of advection-diffusion of predicted severity
+        growth = dynamics_growth(
+            df, days=7, value_column="predicted_severity", **dynamics
+        )
+    else:
+        # Simulated daily growth rate
+        daily_growth = 0.03  # 3% compounding
+        growth = (1 + daily_growth) ** 7
+
+        # Per-city growth fitted on history by forecast_7_day_trend
+        if "forecast_growth_7day" in df.columns:
+            growth = df["forecast_growth_7day"].fillna(growth)
 
     df["projected_7day_severity"] = (
         df["risk_momentum"] *
-        ((1 + daily_growth) ** 7)
+        growth
     )
 
-    df["projected_alert"] = df["projected_7day_severity"].apply(classify_projection)
+    df["projected_alert"] = assign_bands(df["projected_7day_severity"], PROJECTION_BANDS)
 
     return df
 
 
 def classify_projection(value):
-    if value > 1.2:
-        return "EXTREME"
-    elif value > 0.9:
-        return "VERY HIGH"
-    elif value > 0.6:
-        return "HIGH"
-    else:
-        return "MODERATE"
\ No newline at end of file
+    return classify_band(value, PROJECTION_BANDS)
\ No newline at end of file
@@ -0,0 +1,460 @@
+"""
+Live ingest of a CPCB-style JSON feed with incremental pipeline updates.
+
+    python -m backend.live_ingest --url "https://api.data.gov.in/resource/<id>" \
+        --param api-key=<key> --interval 300
+
+    python -m backend.live_ingest --stub data/AQI.csv   # local stub feed
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from backend.streaming_ingest import (
+    DATE_FORMAT,
+    GROUP_KEYS,
+    REQUIRED_POLLUTANTS,
+    aggregate_chunk,
+    merge_partials,
+    pivot_aggregates
+)
+from models.severity_model import calculate_severity_index, severity_maxima
+from simulation.spread_simulation import simulate_spread
+from utils.alert_engine import generate_alerts
+from utils.banding import SEVERITY_BANDS, assign_bands
+from utils.reliability import StreamingReliability
+from utils.source_estimation import estimate_pollution_source
+
+# One reading = one station / pollutant at one timestamp
+RECORD_KEYS = ['state', 'city', 'station', 'pollutant_id']
+CITY_KEYS = ['state', 'city']
+
+
+# ==========================
+# FEED CLIENT
+# ==========================
+def fetch_page(url, offset, limit, params=None, timeout=30):
+    """
+    One page of a data.gov.in style feed:
+    {"total": n, "records": [{state, city, station, last_update, ...}]}.
+    Blocking; the service runs it in a worker thread.
+    """
+    query = dict(params or {}, format="json", offset=offset, limit=limit)
+    separator = "&" if "?" in url else "?"
+
+    with urllib.request.urlopen(url + separator + urllib.parse.urlencode(query), timeout=timeout) as response:
+        return json.load(response)
+
+
+class LiveIngestService:
+    """
+    Polls the feed, aggregates new readings into daily city rows and
+    pushes only the changed cities through severity, spread and alerts.
+
+    Pages are fetched concurrently (at most max_concurrency requests in
+    flight) into a bounded queue; when processing falls behind, fetching
+    waits on the queue instead of piling pages up in memory. A failed
+    poll is logged and retried after an exponential backoff (doubling
+    from poll_interval, capped at max_backoff).
+
+    The latest per-city frame and alerts are replaced (never mutated),
+    so snapshot() can be read from any thread.
+    """
+
+    def __init__(self, url, params=None, poll_interval=60.0, page_size=1000,
+                 max_concurrency=4, queue_size=8, max_backoff=900.0,
+                 wind_direction=90, wind_strength=0.3, intensity_factor=0.2,
+                 on_update=None, fetch=fetch_page):
+        self.url = url
+        self.params = params
+        self.poll_interval = poll_interval
+        self.page_size = page_size
+        self.max_concurrency = max_concurrency
+        self.queue_size = queue_size
+        self.max_backoff = max_backoff
+        self.wind_direction = wind_direction
+        self.wind_strength = wind_strength
+        self.intensity_factor = intensity_factor
+        self.on_update = on_update
+        self.fetch = fetch
+
+        self.aggregates = None
+        self.frame = None
+        self.alerts = None
+        self.source = None
+        self.coordinates = pd.DataFrame({
+            'state': pd.Series(dtype=object),
+            'city': pd.Series(dtype=object),
+            'latitude': pd.Series(dtype=float),
+            'longitude': pd.Series(dtype=float)
+        })
+        self.reliability = StreamingReliability()
+
+        self.version = 0
+        self.updated_at = None
+        self._seen = {}
+        self._maxima = None
+
+    # ---------- async loop ----------
+    async def run(self, stop=None, polls=None):
+        """
+        Poll until `stop` (an asyncio.Event) is set or `polls` polls ran.
+        """
+        stop = stop or asyncio.Event()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        processor = asyncio.create_task(self._process(queue))
+
+        try:
+            count = 0
+            failures = 0
+            while not stop.is_set():
+                try:
+                    await self.poll_once(queue)
+                    failures = 0
+                except Exception as error:
+                    # Network / feed errors end this poll, not the service
+                    failures += 1
+                    print(f"⚠ live ingest: poll failed ({error!r})", file=sys.stderr)
+
+                count += 1
+                if polls is not None and count >= polls:
+                    break
+
+                wait = min(self.poll_interval * 2 ** failures, self.max_backoff)
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+
+            await queue.join()
+        finally:
+            processor.cancel()
+
+    async def poll_once(self, queue):
+        """
+        Fetch every page of the feed; each page is queued as soon as it
+        arrives so processing overlaps with the remaining requests.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch(offset):
+            async with semaphore:
+                page = await asyncio.to_thread(
+                    self.fetch, self.url, offset, self.page_size, self.params
+                )
+            await queue.put(page.get("records", []))
+            return page
+
+        first = await fetch(0)
+        total = int(first.get("total", len(first.get("records", []))))
+
+        await asyncio.gather(*(
+            fetch(offset) for offset in range(self.page_size, total, self.page_size)
+        ))
+
+    async def _process(self, queue):
+        while True:
+            records = await queue.get()
+            try:
+                changed = await asyncio.to_thread(self.apply_records, records)
+                if changed and self.on_update is not None:
+                    self.on_update(self.snapshot(), changed)
+            except Exception as error:
+                # A bad page must not stop the service
+                print(f"⚠ live ingest: skipped page ({error!r})", file=sys.stderr)
+            finally:
+                queue.task_done()
+
+    # ---------- incremental pipeline ----------
+    def _fresh_records(self, records):
+        """
+        Drop readings already seen (the feed repeats the latest hour
+        on every poll) and remember the newest timestamp per reading.
+        """
+        frame = pd.DataFrame.from_records(records)
+        if frame.empty or not set(RECORD_KEYS + ['last_update']) <= set(frame.columns):
+            return None
+
+        stamps = pd.to_datetime(frame['last_update'], format=DATE_FORMAT, errors='coerce')
+
+        fresh = np.zeros(len(frame), dtype=bool)
+        for i, (key, stamp) in enumerate(zip(frame[RECORD_KEYS].itertuples(index=False, name=None), stamps)):
+            if pd.isna(stamp):
+                continue
+            previous = self._seen.get(key)
+            if previous is None or stamp > previous:
+                self._seen[key] = stamp
+                fresh[i] = True
+
+        return frame[fresh] if fresh.any() else None
+
+    def apply_records(self, records):
+        """
+        Fold a page of raw records in and update the affected cities.
+        Returns the list of (state, city) keys that changed.
+        """
+        frame = self._fresh_records(records)
+        if frame is None:
+            return []
+
+        partial, _ = aggregate_chunk(frame)
+        if partial is None:
+            return []
+
+        self.aggregates = merge_partials([self.aggregates, partial])
+        self._update_coordinates(frame)
+
+        # Re-pivot only the (state, city, date) rows this page touched
+        touched = partial[GROUP_KEYS].drop_duplicates()
+        subset = self.aggregates.merge(touched, on=GROUP_KEYS)
+
+        fill = None
+        if self.frame is not None:
+            fill = {p: self.frame[p].median() for p in REQUIRED_POLLUTANTS}
+
+        rows = pivot_aggregates(subset, fill_values=fill)
+        for pollutant in REQUIRED_POLLUTANTS:
+            if pollutant not in rows.columns:
+                rows[pollutant] = np.nan if fill is None else fill[pollutant]
+
+        rows = rows.merge(self.coordinates, on=CITY_KEYS, how='left')
+
+        # Keep each city's latest day
+        rows = rows.sort_values('date').drop_duplicates(CITY_KEYS, keep='last')
+        if self.frame is not None:
+            current = self.frame.set_index(CITY_KEYS)['date']
+            previous = current.reindex(pd.MultiIndex.from_frame(rows[CITY_KEYS]))
+            newer = previous.isna().to_numpy() | (rows['date'].to_numpy() >= previous.fillna("").to_numpy())
+            rows = rows[newer]
+
+        if rows.empty:
+            return []
+
+        self.reliability.update_frame(rows, key=CITY_KEYS)
+        self._update_cities(rows)
+
+        self.version += 1
+        self.updated_at = time.time()
+
+        return list(rows[CITY_KEYS].itertuples(index=False, name=None))
+
+    def _update_coordinates(self, frame):
+        if not {'latitude', 'longitude'} <= set(frame.columns):
+            return
+
+        coords = frame[CITY_KEYS + ['latitude', 'longitude']].copy()
+        coords['latitude'] = pd.to_numeric(coords['latitude'], errors='coerce')
+        coords['longitude'] = pd.to_numeric(coords['longitude'], errors='coerce')
+        coords = coords.dropna().drop_duplicates(CITY_KEYS)
+
+        # First coordinates seen per city win (as in add_coordinates.py)
+        self.coordinates = (
+            pd.concat([self.coordinates, coords], ignore_index=True)
+            .drop_duplicates(CITY_KEYS)
+        )
+
+    def _update_cities(self, rows):
+        """
+        Severity, spread and alerts for the changed rows only; the whole
+        frame is rescored when the maxima change (a city's new reading
+        can raise a maximum or lower the one it held) or the source
+        moves, since either changes every city's value.
+        """
+        if self.frame is None:
+            base = rows.reset_index(drop=True)
+            unchanged = 0
+        else:
+            keep = ~pd.MultiIndex.from_frame(self.frame[CITY_KEYS]).isin(
+                pd.MultiIndex.from_frame(rows[CITY_KEYS])
+            )
+            base = pd.concat([self.frame[keep], rows], ignore_index=True)
+            unchanged = int(keep.sum())
+
+        maxima = severity_maxima(base)
+        rescore_all = maxima != self._maxima
+        self._maxima = maxima
+
+        if rescore_all:
+            scored = calculate_severity_index(base, maxima)
+        else:
+            scored = pd.concat([
+                base.iloc[:unchanged],
+                calculate_severity_index(rows, maxima)
+            ], ignore_index=True)
+
+        # Any changed severity can move the clusters. KMeans depends on
+        # row order, so it sees the cities in key order (as a full run
+        # over the sorted pivot would), not in arrival order.
+        previous = self.source or {}
+        self.source = estimate_pollution_source(scored.sort_values(CITY_KEYS))
+        rescore_all = rescore_all or any(
+            self.source.get(c) != previous.get(c)
+            for c in ("source_latitude", "source_longitude")
+        )
+
+        if self.source.get("source_latitude") is None:
+            self.frame = scored.sort_values(CITY_KEYS, ignore_index=True)
+            return
+
+        if rescore_all:
+            scored = self._spread(scored)
+        else:
+            changed = len(rows)
+            scored = pd.concat([
+                scored.iloc[:-changed],
+                self._spread(scored.iloc[-changed:])
+            ], ignore_index=True)
+
+        self.frame = scored.sort_values(CITY_KEYS, ignore_index=True)
+        self.alerts = generate_alerts(self.frame, self.reliability.scores().rename_axis(CITY_KEYS))
+
+    def _spread(self, df):
+        df = simulate_spread(
+            df,
+            self.source["source_latitude"],
+            self.source["source_longitude"],
+            intensity_factor=self.intensity_factor,
+            wind_direction=self.wind_direction,
+            wind_strength=self.wind_strength
+        )
+        df["severity_label"] = assign_bands(df["predicted_severity"], SEVERITY_BANDS)
+        return df
+
+    def snapshot(self):
+        return {
+            "version": self.version,
+            "updated_at": self.updated_at,
+            "frame": self.frame,
+            "alerts": self.alerts,
+            "source": self.source,
+        }
+
+
+# ==========================
+# STUB FEED (local testing)
+# ==========================
+class StubFeedServer:
+    """
+    Serves records in the feed's paged JSON format from a local HTTP
+    server (in a background thread). add_records() simulates new
+    readings arriving between polls.
+    """
+
+    def __init__(self, records=(), host="127.0.0.1", port=0):
+        self.records = list(records)
+        self._lock = threading.Lock()
+
+        feed = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+                offset = int(query.get("offset", ["0"])[0])
+                limit = int(query.get("limit", ["1000"])[0])
+
+                with feed._lock:
+                    total = len(feed.records)
+                    page = feed.records[offset:offset + limit]
+
+                body = json.dumps({
+                    "total": total, "count": len(page),
+                    "offset": offset, "limit": limit, "records": page
+                }).encode()
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/feed"
+
+    def add_records(self, records):
+        with self._lock:
+            self.records.extend(records)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def csv_records(path):
+    """
+    Raw CPCB export rows as feed records (all values as strings).
+    """
+    return pd.read_csv(path, dtype=str, keep_default_na=False).to_dict("records")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Live CPCB feed ingest")
+    parser.add_argument("--url", default=None, help="feed URL (omit with --stub)")
+    parser.add_argument("--param", action="append", default=[], help="extra query parameter key=value")
+    parser.add_argument("--stub", default=None, help="serve this raw CSV from a local stub feed")
+    parser.add_argument("--interval", type=float, default=60.0)
+    parser.add_argument("--polls", type=int, default=None, help="stop after this many polls")
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    stub = None
+    url = args.url
+    if args.stub:
+        stub = StubFeedServer(csv_records(args.stub)).start()
+        url = stub.url
+    if url is None:
+        parser.error("--url or --stub is required")
+
+    def report(snapshot, changed):
+        alerts = snapshot["alerts"]
+        top = alerts.iloc[0] if alerts is not None and len(alerts) else None
+        print(
+            f"v{snapshot['version']}: {len(changed)} cities updated"
+            + (f", top alert {top['city']} ({top['alert_level']})" if top is not None else "")
+        )
+
+    service = LiveIngestService(
+        url,
+        params=dict(p.split("=", 1) for p in args.param),
+        poll_interval=args.interval,
+        page_size=args.page_size,
+        max_concurrency=args.concurrency,
+        on_update=report
+    )
+
+    try:
+        asyncio.run(service.run(polls=args.polls))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if stub is not None:
+            stub.stop()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,379 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from utils.pipeline_cache import cached_stage
+from utils.compact_frame import compact_dtypes, compact_frame, stage_frame
+from backend.pipeline_graph import Node, PipelineGraph
+from backend.timeseries_store import (
+    TIMESERIES_PATH,
+    TimeSeriesStore,
+    timeseries_exists,
+    timeseries_version
+)
+from backend.columnar_store import (
+    STORE_PATH,
+    list_states,
+    load_store,
+    store_exists,
+    store_version
+)
+from utils.reliability import calculate_station_reliability
+from utils.source_estimation import estimate_pollution_source
+from utils.alert_engine import generate_alerts
+from utils.urban_rural_analysis import classify_urban_rural, compare_urban_rural
+from utils.banding import SEVERITY_BANDS, assign_bands
+from utils.resolution import entity_key, reduce_to_city
+from simulation.spread_simulation import simulate_spread
+from simulation.scenario_sweep import DEFAULT_DIRECTIONS, DEFAULT_STRENGTHS, build_sweep_cube
+from simulation.spatial_pyramid import build_pyramid
+from backend.risk_momentum import calculate_risk_momentum
+from backend.impact_projection import project_7day_impact
+from models.severity_model import calculate_severity_index
+from models.risk_model import calculate_risk_score
+from models.forecast_model import forecast_7_day_trend
+
+DATA_PATH = "data/cleaned_aqi_with_coords.csv"
+
+# One row per station and date (clean_aqi.py + add_coordinates.py)
+STATION_DATA_PATH = "data/cleaned_aqi_stations.csv"
+
+RESOLUTIONS = ("city", "station")
+
+# Scenario -> multiplier applied to predicted severity after spread
+SCENARIO_MULTIPLIERS = {
+    "Normal Conditions": 1.0,
+    "Industrial Surge (+30%)": 1.3,
+    "High Wind Spread": 1.2,
+    "Emergency Containment": 0.7
+}
+
+# Sweep grid (5 degrees, 0.1 strength); SweepCube.apply interpolates
+# the dashboard's 1 degree settings in between
+SWEEP_DIRECTIONS = DEFAULT_DIRECTIONS
+SWEEP_STRENGTHS = DEFAULT_STRENGTHS
+
+# Cubes are ~(72 x 11 x N) float32, so the node cache is capped by size
+SWEEP_CACHE_BYTES = 256 * 1024 ** 2
+
+
+# ==========================
+# CACHED STAGES
+# ==========================
+# These live in an imported module (not in dashboard.py) so the caches
+# survive Streamlit reruns and are shared by every session on the server.
+
+@cached_stage(maxsize=4)
+def _read_dataset(path, modified_time, compact=False):
+    return pd.read_csv(path, dtype=compact_dtypes() if compact else None)
+
+
+@cached_stage(maxsize=64)
+def _read_store(store_path, version, state, compact=False):
+    df = load_store(store_path, states=state)
+    # Same "YYYY-MM-DD" strings as the CSV, whichever source is read
+    df["date"] = df["date"].dt.strftime("%Y-%m-%d")
+    return compact_frame(df) if compact else df
+
+
+@cached_stage(maxsize=4)
+def _read_store_states(store_path, version):
+    return list_states(store_path)
+
+
+_stale_warned = set()
+
+
+def _current_store(path, store_path):
+    """
+    The store's version when it exists and is at least as new as the
+    CSV; None means the CSV is to be read. A store older than the CSV
+    (e.g. clean_aqi.py ran after build_store.py) is skipped with a
+    warning instead of silently serving stale data.
+    """
+    if not store_exists(store_path):
+        return None
+
+    version = store_version(store_path)
+
+    if os.path.exists(path) and os.path.getmtime(path) > version:
+        if (store_path, version) not in _stale_warned:
+            _stale_warned.add((store_path, version))
+            print(f"⚠ {store_path} is older than {path}; reading the CSV (re-run build_store.py)",
+                  file=sys.stderr)
+        return None
+
+    return version
+
+
+def load_dataset(path=DATA_PATH, state=None, store_path=STORE_PATH, compact=False,
+                 resolution="city", station_path=STATION_DATA_PATH):
+    """
+    Load the cleaned dataset (optionally a single state).
+
+    Reads from the partitioned Parquet store when it has been built
+    (build_store.py) and is not older than the CSV, so only that
+    state's files are touched; otherwise falls back to the CSV. Files
+    are re-read only when they change.
+
+    compact=True returns categorical state/city and float32 measures
+    (see utils.compact_frame) for a fraction of the memory.
+
+    resolution="station" loads one row per station (station_path, with
+    each station's own coordinates) instead of one per city.
+    """
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"Unknown resolution: {resolution}")
+
+    if resolution == "station":
+        path = station_path
+    else:
+        version = _current_store(path, store_path)
+        if version is not None:
+            return _read_store(store_path, version, state, compact)
+
+    df = _read_dataset(path, os.path.getmtime(path), compact)
+
+    if state is not None:
+        df = df[df["state"] == state]
+
+    return df
+
+
+@cached_stage(maxsize=4)
+def _open_timeseries(root, version):
+    return TimeSeriesStore(root)
+
+
+def load_timeseries(root=TIMESERIES_PATH):
+    """
+    Memory-mapped history store (build_store.py) for history=, or None
+    when it has not been built. Reopened only when it is rewritten.
+    """
+    if not timeseries_exists(root):
+        return None
+
+    return _open_timeseries(root, timeseries_version(root))
+
+
+def dataset_version(path=DATA_PATH, store_path=STORE_PATH):
+    """
+    Changes whenever load_dataset would read different data (cache key).
+    """
+    version = _current_store(path, store_path)
+    if version is not None:
+        return ("store", version)
+
+    return ("csv", os.path.getmtime(path))
+
+
+def available_states(path=DATA_PATH, store_path=STORE_PATH):
+    version = _current_store(path, store_path)
+    if version is not None:
+        return _read_store_states(store_path, version)
+
+    return sorted(load_dataset(path, store_path=store_path)["state"].unique())
+
+
+# ==========================
+# PIPELINE GRAPH
+# ==========================
+def apply_scenario(df, scenario):
+    multiplier = SCENARIO_MULTIPLIERS[scenario]
+
+    if multiplier != 1.0:
+        df["predicted_severity"] *= multiplier
+
+    return df
+
+
+# The sweep cube is evaluated at multiplier 1.0; the scenario node
+# scales it like the non-sweep path does
+NEUTRAL_SCENARIO = {"Normal Conditions": 1.0}
+
+
+def _sweep_cube(risk_score, source, intensity_factor, sweep):
+    if not sweep:
+        return None
+
+    return build_sweep_cube(
+        risk_score,
+        source["source_latitude"],
+        source["source_longitude"],
+        NEUTRAL_SCENARIO,
+        directions=SWEEP_DIRECTIONS,
+        strengths=SWEEP_STRENGTHS,
+        intensity_factor=intensity_factor
+    )
+
+
+def _spread(risk_score, source, sweep_cube, wind_direction, wind_strength, intensity_factor):
+    if sweep_cube is not None:
+        return sweep_cube.apply(risk_score, wind_direction, wind_strength, "Normal Conditions")
+
+    return simulate_spread(
+        risk_score,
+        source["source_latitude"],
+        source["source_longitude"],
+        intensity_factor=intensity_factor,
+        wind_direction=wind_direction,
+        wind_strength=wind_strength
+    )
+
+
+def _scenario(spread, scenario):
+    df = apply_scenario(stage_frame(spread), scenario)
+
+    # Severity Classification
+    df["severity_label"] = assign_bands(df["predicted_severity"], SEVERITY_BANDS)
+
+    return df
+
+
+# Stages after this point add columns in place, so each node works on
+# its own (shallow under copy-on-write) copy of the cached upstream frame
+PIPELINE_GRAPH = PipelineGraph([
+    Node("severity", calculate_severity_index, params=["df"], maxsize=32),
+    Node(
+        "forecast",
+        lambda severity, history, forecast_method: forecast_7_day_trend(
+            severity, history=history, method=forecast_method, key=entity_key(severity)
+        ),
+        params=["history", "forecast_method"],
+        upstream=["severity"],
+        maxsize=32
+    ),
+    Node("risk_score", lambda forecast: calculate_risk_score(forecast), upstream=["forecast"], maxsize=32),
+    Node(
+        "reliability", lambda df: calculate_station_reliability(df, key=entity_key(df)),
+        params=["df"], maxsize=32
+    ),
+    Node("source", lambda severity: estimate_pollution_source(severity), upstream=["severity"], maxsize=32),
+    Node(
+        "sweep_cube", _sweep_cube,
+        params=["intensity_factor", "sweep"],
+        upstream=["risk_score", "source"],
+        maxsize=8,
+        maxbytes=SWEEP_CACHE_BYTES
+    ),
+    Node(
+        "spread", _spread,
+        params=["wind_direction", "wind_strength", "intensity_factor"],
+        upstream=["risk_score", "source", "sweep_cube"]
+    ),
+    Node("scenario", _scenario, params=["scenario"], upstream=["spread"]),
+    Node(
+        "momentum",
+        lambda scenario: calculate_risk_momentum(stage_frame(scenario), key=entity_key(scenario)),
+        upstream=["scenario"]
+    ),
+    Node(
+        "projection", lambda momentum: project_7day_impact(stage_frame(momentum)),
+        upstream=["momentum"]
+    ),
+    Node(
+        "alerts", lambda projection, reliability: generate_alerts(projection, reliability),
+        upstream=["projection", "reliability"]
+    ),
+    # City view of station-level results (a pass-through for city frames)
+    Node("city", lambda projection: reduce_to_city(projection), upstream=["projection"]),
+    Node("urban_rural", lambda city: classify_urban_rural(city), upstream=["city"]),
+    Node("comparison", lambda urban_rural: compare_urban_rural(urban_rural), upstream=["urban_rural"]),
+    Node("pyramid", lambda projection: build_pyramid(projection), upstream=["projection"], maxsize=8),
+])
+
+
+def pipeline_params(df, wind_direction=90, wind_strength=0.3,
+                    scenario="Normal Conditions", intensity_factor=0.2,
+                    sweep=False, history=None, forecast_method="linear"):
+    return {
+        "df": df,
+        "wind_direction": wind_direction,
+        "wind_strength": wind_strength,
+        "scenario": scenario,
+        "intensity_factor": intensity_factor,
+        "sweep": sweep,
+        "history": history,
+        "forecast_method": forecast_method,
+    }
+
+
+def run_pipeline(df, wind_direction=90, wind_strength=0.3,
+                 scenario="Normal Conditions", intensity_factor=0.2,
+                 sweep=False, history=None, forecast_method="linear",
+                 pyramid=False, resolution="city", profiler=None):
+    """
+    severity -> forecast -> risk score -> reliability -> source
+    -> spread -> scenario -> momentum -> projection -> alerts -> urban/rural.
+
+    Shared by the dashboard and the batch runner. Returns None when the
+    selection has no usable coordinates for source estimation.
+
+    Runs on PIPELINE_GRAPH: only nodes downstream of a changed input
+    execute (a scenario change reruns scenario onwards, never severity
+    or KMeans). With sweep=True, spread is read from a cached wind
+    cube, so changing the wind controls is an array lookup.
+
+    history (dated per-city readings, or the memory-mapped store from
+    load_timeseries) switches the forecast stage from the constant
+    growth factor to per-city fitted models.
+
+    Station-level frames (load_dataset(resolution="station")) are scored
+    per station, so source estimation and spread see every station's
+    location. resolution picks the returned frame: "city" reduces it
+    per city (cached; urban/rural always uses the city view), "station"
+    keeps one row per station. Station runs also return the per-station
+    frame as "stations", and their alerts name the station.
+
+    pyramid=True adds a SpatialPyramid of the results (per-cell
+    severity rollups for low-zoom maps and nationwide summaries).
+
+    Pass a utils.instrumentation.StageProfiler to record every node
+    that actually executes.
+    """
+    if scenario not in SCENARIO_MULTIPLIERS:
+        raise ValueError(f"Unknown scenario: {scenario}")
+
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"Unknown resolution: {resolution}")
+
+    graph_run = PIPELINE_GRAPH.start(
+        pipeline_params(
+            df, wind_direction, wind_strength, scenario,
+            intensity_factor, sweep, history, forecast_method
+        ),
+        profiler
+    )
+
+    source = graph_run.get("source")
+
+    if (
+        source is None or
+        source.get("source_latitude") is None or
+        source.get("source_longitude") is None
+    ):
+        return None
+
+    station_reliability = graph_run.get("reliability")
+
+    # Results are cached and shared; callers get their own frames
+    result = {
+        "frame": stage_frame(graph_run.get("city" if resolution == "city" else "projection")),
+        "reliability": round(float(station_reliability.mean()), 4),
+        "station_reliability": station_reliability,
+        "source": source,
+        "alerts": graph_run.get("alerts"),
+        "classified": stage_frame(graph_run.get("urban_rural")),
+        "comparison": graph_run.get("comparison"),
+        "executed": graph_run.executed
+    }
+
+    if "station" in df.columns:
+        result["stations"] = stage_frame(graph_run.get("projection"))
+
+    if pyramid:
+        result["pyramid"] = graph_run.get("pyramid")
+
+    return result
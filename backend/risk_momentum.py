@@ -1,6 +1,125 @@
 import numpy as np
+import pandas as pd
 
-def calculate_risk_momentum(df):
+from utils.banding import MOMENTUM_BANDS, assign_bands, classify_band
+
+MOMENTUM_WINDOW = 7
+MOMENTUM_COLUMNS = ["momentum_slope", "momentum_roc", "momentum_acceleration", "momentum_factor"]
+
+
+def _day_numbers(df, date_column):
+    """
+    Day ordinal per row (dates parsed once per distinct value);
+    row order when the frame has no dates.
+    """
+    if date_column not in df.columns:
+        return np.arange(len(df), dtype=float)
+
+    codes, uniques = pd.factorize(df[date_column])
+    days = pd.DatetimeIndex(pd.to_datetime(uniques)).normalize()
+    ordinals = np.asarray((days - pd.Timestamp("1970-01-01")).days, dtype=float)
+
+    # factorize gives missing dates code -1, which picks the trailing NaN
+    return np.append(ordinals, np.nan)[codes]
+
+
+def momentum_arrays(groups, days, values, window=MOMENTUM_WINDOW):
+    """
+    Rolling slope, rate of change and acceleration of `values` per group
+    over the last `window` readings, in one pass over the date-sorted
+    rows (windowed sums from cumulative sums, no per-group loop).
+
+    Returns a dict of arrays in the input row order.
+    """
+    n_rows = len(values)
+    if n_rows == 0:
+        return {name: np.empty(0) for name in ("slope", "roc", "acceleration", "level")}
+
+    order = np.lexsort((days, groups))
+    g = groups[order]
+    y = values[order].astype(float)
+
+    rows = np.arange(n_rows)
+    first = np.r_[True, g[1:] != g[:-1]]
+    group_start = np.maximum.accumulate(np.where(first, rows, 0))
+    window_start = np.maximum(rows - window + 1, group_start)
+
+    # Days relative to the group's first reading keep the sums small
+    t = days[order] - days[order][group_start]
+
+    observed = ~np.isnan(y) & ~np.isnan(t)
+    weight = observed.astype(float)
+    y = np.where(observed, y, 0.0)
+    t = np.where(observed, t, 0.0)
+
+    def window_sum(x):
+        totals = np.r_[0.0, np.cumsum(x)]
+        return totals[rows + 1] - totals[window_start]
+
+    n = window_sum(weight)
+    sum_t = window_sum(weight * t)
+    sum_tt = window_sum(weight * t * t)
+    sum_y = window_sum(y)
+    sum_ty = window_sum(y * t)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        denominator = n * sum_tt - sum_t ** 2
+        slope = np.where(denominator > 0, (n * sum_ty - sum_t * sum_y) / denominator, 0.0)
+        level = np.where(n > 0, sum_y / n, np.nan)
+
+        oldest = values[order][window_start]
+        newest = values[order]
+        roc = np.where(window_start < rows, (newest - oldest) / np.abs(oldest), 0.0)
+
+        # Change of slope per day since the group's previous reading
+        gap = np.r_[1.0, np.diff(t)]
+        previous_slope = np.r_[0.0, slope[:-1]]
+        acceleration = np.where(first, 0.0, (slope - previous_slope) / np.where(gap > 0, gap, 1.0))
+
+    result = {}
+    for name, sorted_values in (
+        ("slope", slope), ("roc", roc), ("acceleration", acceleration), ("level", level)
+    ):
+        out = np.empty(n_rows)
+        out[order] = np.nan_to_num(sorted_values, nan=0.0, posinf=0.0, neginf=0.0)
+        result[name] = out
+
+    return result
+
+
+def _momentum_factor(arrays, window):
+    """
+    Relative trend over one window, bounded to +/-50%.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        relative = np.where(arrays["level"] > 0, arrays["slope"] / arrays["level"], 0.0)
+
+    return 1 + np.clip(relative * window, -0.5, 0.5)
+
+
+def _apply_momentum(df, arrays, window):
+    df["momentum_slope"] = arrays["slope"]
+    df["momentum_roc"] = arrays["roc"]
+    df["momentum_acceleration"] = arrays["acceleration"]
+    df["momentum_factor"] = _momentum_factor(arrays, window)
+
+    df["risk_momentum"] = (
+        df["predicted_severity"] *
+        df["momentum_factor"]
+    )
+
+    df["momentum_level"] = assign_bands(df["risk_momentum"], MOMENTUM_BANDS)
+
+    return df
+
+
+def calculate_risk_momentum(df, window=MOMENTUM_WINDOW, key=("state", "city"), date_column="date"):
+    """
+    Momentum of predicted severity from each city's own date series:
+    rolling slope, rate of change and acceleration over the last
+    `window` readings. A rising trend scales risk_momentum up, a falling
+    one down; a city with a single reading keeps its severity.
+    """
 
     # If predicted_severity missing, fallback to severity_index
     if "predicted_severity" not in df.columns:
@@ -9,25 +128,74 @@ def calculate_risk_momentum(df):
         else:
             return df
 
-    # Always create columns (even if values are small)
-    df["volatility_factor"] = np.random.uniform(0.95, 1.05, len(df))
+    groups = df.groupby(list(key), sort=False, observed=True, dropna=False).ngroup().to_numpy()
 
-    df["risk_momentum"] = (
-        df["predicted_severity"] *
-        df["volatility_factor"]
+    arrays = momentum_arrays(
+        groups,
+        _day_numbers(df, date_column),
+        df["predicted_severity"].to_numpy(dtype=float),
+        window
     )
 
-    df["momentum_level"] = df["risk_momentum"].apply(classify_momentum)
+    return _apply_momentum(df, arrays, window)
 
-    return df
+
+class RiskMomentumTracker:
+    """
+    Incremental momentum for daily ingest: keeps the last `window`
+    readings per city, so a new day costs O(cities * window) instead
+    of a pass over the full history.
+    """
+
+    def __init__(self, window=MOMENTUM_WINDOW, key=("state", "city"), date_column="date"):
+        self.window = window
+        self.key = list(key)
+        self.date_column = date_column
+        self._tail = None
+
+    def update(self, df):
+        """
+        Add the new day's rows (with predicted_severity or severity_index)
+        and return them with the momentum columns.
+        """
+        df = df.copy()
+
+        if "predicted_severity" not in df.columns:
+            df["predicted_severity"] = df["severity_index"]
+
+        new = df[self.key].copy()
+        new["_day"] = _day_numbers(df, self.date_column)
+        new["_value"] = df["predicted_severity"].to_numpy(dtype=float)
+        new["_new"] = True
+
+        if self._tail is not None:
+            combined = pd.concat([self._tail, new], ignore_index=True)
+        else:
+            combined = new.reset_index(drop=True)
+
+        groups = combined.groupby(self.key, sort=False, observed=True, dropna=False).ngroup().to_numpy()
+
+        arrays = momentum_arrays(
+            groups,
+            combined["_day"].to_numpy(dtype=float),
+            combined["_value"].to_numpy(dtype=float),
+            self.window
+        )
+
+        is_new = combined["_new"].to_numpy(dtype=bool)
+        df = _apply_momentum(df, {name: values[is_new] for name, values in arrays.items()}, self.window)
+
+        # Keep the last `window` readings per city for the next day
+        combined["_new"] = False
+        self._tail = (
+            combined.sort_values("_day", kind="stable")
+            .groupby(self.key, sort=False, observed=True, dropna=False)
+            .tail(self.window)
+            .reset_index(drop=True)
+        )
+
+        return df
 
 
 def classify_momentum(value):
-    if value > 1.0:
-        return "SURGING"
-    elif value > 0.7:
-        return "RISING"
-    elif value > 0.4:
-        return "STABLE"
-    else:
-        return "LOW"
\ No newline at end of file
+    return classify_band(value, MOMENTUM_BANDS)
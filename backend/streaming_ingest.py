@@ -0,0 +1,301 @@
+import hashlib
+import io
+import json
+import os
+
+import pandas as pd
+
+REQUIRED_POLLUTANTS = ['PM2.5', 'PM10', 'NO2']
+GROUP_KEYS = ['state', 'city', 'date']
+
+# Station-level aggregates; city rows are a sum over these (see clean_aqi.py)
+STATION_KEYS = ['state', 'city', 'station', 'date']
+
+# One reading per station and pollutant per hour; used to tell apart
+# rows of the high-water hour that were already ingested
+READING_KEYS = ['state', 'city', 'station', 'pollutant_id']
+
+# CPCB exports use day-first timestamps, e.g. "19-05-2025 10:00:00".
+# Parsing with a fixed format keeps every chunk consistent.
+DATE_FORMAT = "%d-%m-%Y %H:%M:%S"
+
+# Bytes before the resume offset hashed into the state, to notice a
+# rewritten (rather than appended-to) export
+FINGERPRINT_BYTES = 4096
+
+
+def reading_ids(chunk):
+    """
+    "state|city|station|pollutant" strings identifying each row's reading.
+    """
+    return chunk[READING_KEYS].astype(str).agg('|'.join, axis=1)
+
+
+def filter_chunk(chunk, since=None, seen=None,
+                 pollutants=REQUIRED_POLLUTANTS,
+                 date_format=DATE_FORMAT,
+                 cutoff=True):
+    """
+    Required-pollutant rows with a valid last_update newer than `since`.
+    Rows stamped exactly `since` are kept unless their reading id is in
+    `seen` (the readings of that hour already ingested), so late rows
+    for the high-water hour are not lost. Returns (rows, last_update).
+
+    cutoff=False keeps older rows too (only the `seen` check applies),
+    for bytes known to be new, e.g. a resumed append.
+    """
+
+    chunk = chunk[chunk['pollutant_id'].isin(pollutants)]
+
+    last_update = pd.to_datetime(chunk['last_update'], format=date_format, errors='coerce')
+
+    keep = last_update.notna()
+    if since is not None:
+        boundary = last_update == since
+        if seen and boundary.any():
+            keep &= ~(boundary & reading_ids(chunk).isin(seen))
+        if cutoff:
+            keep &= last_update >= since
+
+    return chunk[keep], last_update[keep]
+
+
+def aggregate_chunk(chunk, since=None, seen=None,
+                    pollutants=REQUIRED_POLLUTANTS,
+                    date_format=DATE_FORMAT,
+                    keys=GROUP_KEYS):
+    """
+    Filter one raw chunk (see filter_chunk) and reduce it to partial
+    aggregates: (keys..., pollutant_id) -> sum / count of pollutant_avg.
+
+    Returns (partial, newest timestamp).
+    """
+
+    chunk, last_update = filter_chunk(chunk, since, seen, pollutants, date_format)
+
+    if chunk.empty:
+        return None, None
+
+    return _partial(chunk, last_update, keys), last_update.max()
+
+
+def _partial(chunk, last_update, keys):
+    chunk = chunk.assign(
+        date=last_update.dt.strftime('%Y-%m-%d'),
+        pollutant_avg=pd.to_numeric(chunk['pollutant_avg'], errors='coerce')
+    )
+
+    return (
+        chunk.groupby(keys + ['pollutant_id'])['pollutant_avg']
+        .agg(['sum', 'count'])
+        .reset_index()
+    )
+
+
+def merge_partials(partials, keys=GROUP_KEYS):
+    """
+    Combine partial aggregates; sums and counts add up exactly.
+    """
+    partials = [p for p in partials if p is not None and not p.empty]
+
+    if not partials:
+        return pd.DataFrame(columns=keys + ['pollutant_id', 'sum', 'count'])
+
+    return (
+        pd.concat(partials, ignore_index=True)
+        .groupby(keys + ['pollutant_id'], as_index=False)[['sum', 'count']]
+        .sum()
+    )
+
+
+def pivot_aggregates(aggregates, pollutants=REQUIRED_POLLUTANTS, keys=GROUP_KEYS,
+                     fill_values=None):
+    """
+    Turn merged aggregates into the cleaned wide table
+    (same layout as the original pivot_table + median fill).
+
+    fill_values (pollutant -> value) replaces the table's own medians,
+    e.g. when pivoting only a few updated rows.
+    """
+    aggregates = aggregates[aggregates['count'] > 0]
+
+    means = aggregates.assign(value=aggregates['sum'] / aggregates['count'])
+
+    wide = means.pivot_table(
+        index=keys,
+        columns='pollutant_id',
+        values='value'
+    )
+
+    wide = wide.reindex(columns=sorted(set(pollutants) & set(wide.columns)))
+    wide.columns.name = None
+    wide = wide.reset_index()
+
+    # Fill missing pollutant values with median
+    for pollutant in pollutants:
+        if pollutant not in wide.columns:
+            continue
+        if fill_values is not None and pollutant in fill_values:
+            wide[pollutant] = wide[pollutant].fillna(fill_values[pollutant])
+        else:
+            wide[pollutant] = wide[pollutant].fillna(wide[pollutant].median())
+
+    return wide
+
+
+def load_ingest_state(state_path):
+    if not os.path.exists(state_path):
+        return {"last_update": None, "rows_ingested": 0}
+
+    with open(state_path) as f:
+        return json.load(f)
+
+
+def save_ingest_state(state_path, state):
+    with open(state_path, "w") as f:
+        json.dump(state, f, indent=2)
+
+
+# ==========================
+# RESUMABLE READS
+# ==========================
+class _ByteWindow(io.RawIOBase):
+    """
+    Read-only view of bytes [start, end) of an open binary file.
+    """
+
+    def __init__(self, f, start, end):
+        self.f = f
+        self.remaining = end - start
+        f.seek(start)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self.remaining)
+        data = self.f.read(size)
+        buffer[:len(data)] = data
+        self.remaining -= len(data)
+        return len(data)
+
+
+def _complete_length(f, block=1 << 16):
+    """
+    Length of the file up to and including its last newline; a line
+    still being written is left for the next run.
+    """
+    pos = f.seek(0, os.SEEK_END)
+    while pos > 0:
+        step = min(pos, block)
+        f.seek(pos - step)
+        cut = f.read(step).rfind(b"\n")
+        if cut >= 0:
+            return pos - step + cut + 1
+        pos -= step
+    return 0
+
+
+def _fingerprint(f, header, offset):
+    """
+    Hash of the header and the bytes just before `offset`; it changes
+    when the export was rewritten instead of appended to.
+    """
+    f.seek(max(offset - FINGERPRINT_BYTES, 0))
+    tail = f.read(offset - f.tell())
+    return hashlib.blake2b(header + tail, digest_size=16).hexdigest()
+
+
+def stream_ingest(raw_path, output_path, aggregates_path, state_path,
+                  chunksize=200_000, incremental=True,
+                  keys=GROUP_KEYS):
+    """
+    Chunked, incremental ingest of a raw CPCB export.
+
+    The state stores the byte offset read up to, a fingerprint of the
+    bytes before it, the high-water timestamp and the readings already
+    ingested at that timestamp. An appended-to export is read from the
+    offset only, and every row past it counts, however old its
+    timestamp; a rewritten one is re-read in full, with rows up to the
+    high-water mark skipped. The partial aggregates are persisted next
+    to the output, so each run only adds the new readings.
+    """
+
+    state = load_ingest_state(state_path) if incremental else {"last_update": None, "rows_ingested": 0}
+
+    since = pd.Timestamp(state["last_update"]) if state["last_update"] else None
+
+    if incremental and since is not None and os.path.exists(aggregates_path):
+        aggregates = pd.read_csv(aggregates_path, dtype={'date': str})
+        seen = set(state.get("boundary", []))
+    else:
+        aggregates = None
+        since = None
+        seen = set()
+
+    partials = [aggregates]
+    newest, boundary = since, set(seen)
+    rows = 0
+
+    usecols = list(dict.fromkeys(
+        [k for k in keys if k != 'date'] + READING_KEYS + ['last_update', 'pollutant_avg']
+    ))
+
+    with open(raw_path, 'rb') as f:
+        header = f.readline()
+        columns = list(pd.read_csv(io.BytesIO(header), nrows=0).columns)
+
+        end = _complete_length(f)
+        offset = state.get("offset") if since is not None else None
+
+        if offset is None or offset > end or _fingerprint(f, header, offset) != state.get("fingerprint"):
+            offset = 0
+
+        # Past a verified offset every byte is new; the high-water mark
+        # only guards a full re-read
+        resumed = offset > 0
+
+        reader = pd.read_csv(
+            io.BufferedReader(_ByteWindow(f, offset, end)),
+            chunksize=chunksize,
+            header=0 if offset == 0 else None,
+            names=None if offset == 0 else columns,
+            usecols=usecols
+        )
+
+        for chunk in reader:
+            chunk, last_update = filter_chunk(chunk, since=since, seen=seen, cutoff=not resumed)
+
+            if chunk.empty:
+                continue
+
+            partial = _partial(chunk, last_update, keys)
+            partials.append(partial)
+            rows += int(partial['count'].sum())
+
+            chunk_newest = last_update.max()
+            if newest is None or chunk_newest > newest:
+                newest, boundary = chunk_newest, set()
+            if chunk_newest == newest:
+                boundary.update(reading_ids(chunk[last_update == newest]))
+
+        fingerprint = _fingerprint(f, header, end)
+
+    # Partials are per-chunk group sums, far smaller than the chunks;
+    # one merge at the end keeps the fold linear
+    aggregates = merge_partials(partials, keys=keys)
+    aggregates.to_csv(aggregates_path, index=False)
+
+    cleaned = pivot_aggregates(aggregates, keys=keys)
+    cleaned.to_csv(output_path, index=False)
+
+    state = {
+        "last_update": newest.isoformat() if newest is not None else None,
+        "boundary": sorted(boundary),
+        "offset": end,
+        "fingerprint": fingerprint,
+        "rows_ingested": state["rows_ingested"] + rows
+    }
+    save_ingest_state(state_path, state)
+
+    return cleaned, rows
@@ -0,0 +1,221 @@
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from models.severity_model import calculate_severity_index
+from models.timeseries_forecast import history_matrix
+
+TIMESERIES_PATH = "data/aqi_timeseries"
+STATION_TIMESERIES_PATH = "data/aqi_timeseries_stations"
+INDEX_FILE = "index.json"
+
+SERIES_COLUMNS = ["PM2.5", "PM10", "NO2", "severity_index"]
+
+# Layout: one float32 .npy matrix per column, series x day (C-order, so
+# one series' days are contiguous and a state's series are adjacent
+# rows), NaN where a series has no reading that day. index.json holds
+# the series keys, the first date and the file of every column.
+# Files are opened with mmap, so reads only page in the slice asked
+# for, and worker processes share the OS page cache.
+
+
+def _file_name(column):
+    return re.sub(r"[^a-z0-9]+", "_", column.lower()).strip("_") + ".npy"
+
+
+def _replace(path, write):
+    """
+    Write to a temporary file and rename it over `path`, so readers
+    never map a half-written file.
+    """
+    tmp = path + ".tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def write_timeseries(history, root=TIMESERIES_PATH, key=("state", "city"),
+                     date_column="date", columns=SERIES_COLUMNS):
+    """
+    Turn a long, dated history frame (the cleaned CSV, or station rows
+    with key=("state", "city", "station")) into the memory-mapped store.
+    severity_index is computed when the history does not have it.
+    """
+    keys = list(key)
+    os.makedirs(root, exist_ok=True)
+
+    if "severity_index" in columns and "severity_index" not in history.columns:
+        history = calculate_severity_index(history)
+
+    files = {}
+
+    for column in columns:
+        values, series, dates = history_matrix(history, column, keys, date_column)
+
+        def write(path):
+            mapped = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=values.shape)
+            mapped[:] = values
+            mapped.flush()
+
+        files[column] = _file_name(column)
+        _replace(os.path.join(root, files[column]), write)
+
+    index = {
+        "key": keys,
+        "series": [
+            [str(part) for part in (entry if isinstance(entry, tuple) else (entry,))]
+            for entry in series
+        ],
+        "start": dates[0].strftime("%Y-%m-%d") if len(dates) else None,
+        "days": len(dates),
+        "columns": files,
+    }
+
+    def write_index(path):
+        with open(path, "w") as f:
+            json.dump(index, f)
+
+    # The index goes last: it is what readers check for changes
+    _replace(os.path.join(root, INDEX_FILE), write_index)
+
+    return TimeSeriesStore(root)
+
+
+def timeseries_exists(root=TIMESERIES_PATH):
+    return os.path.exists(os.path.join(root, INDEX_FILE))
+
+
+def timeseries_version(root=TIMESERIES_PATH):
+    return os.path.getmtime(os.path.join(root, INDEX_FILE))
+
+
+class TimeSeriesStore:
+    """
+    Read side of the store. Date ranges, the last N days and a state's
+    (or any adjacent run of) series are basic slices of the mapped
+    arrays, i.e. read-only views that copy nothing. Other series
+    selections fall back to a gathered copy of just those rows.
+
+    Stores compare equal while their files are unchanged, so a store can
+    be passed as a pipeline parameter (e.g. run_pipeline(history=...)).
+    """
+
+    def __init__(self, root=TIMESERIES_PATH):
+        self.root = os.path.abspath(root)
+        with open(os.path.join(self.root, INDEX_FILE)) as f:
+            index = json.load(f)
+
+        self.version = timeseries_version(self.root)
+        self.key = index["key"]
+        self.columns = index["columns"]
+
+        if len(self.key) == 1:
+            self.series = pd.Index([entry[0] for entry in index["series"]], name=self.key[0])
+        else:
+            self.series = pd.MultiIndex.from_tuples(
+                [tuple(entry) for entry in index["series"]], names=self.key
+            )
+
+        if index["start"] is None:
+            self.dates = pd.DatetimeIndex([])
+        else:
+            self.dates = pd.date_range(index["start"], periods=index["days"], freq="D")
+
+        self._arrays = {}
+
+    def __eq__(self, other):
+        return isinstance(other, TimeSeriesStore) and (self.root, self.version) == (other.root, other.version)
+
+    def __hash__(self):
+        return hash((self.root, self.version))
+
+    def array(self, column):
+        """
+        The full (series, days) matrix of a column, memory-mapped.
+        """
+        if column not in self._arrays:
+            if column not in self.columns:
+                raise KeyError(f"Column not in store: {column}")
+            path = os.path.join(self.root, self.columns[column])
+            self._arrays[column] = np.load(path, mmap_mode="r")
+
+        return self._arrays[column]
+
+    def _day_slice(self, start=None, end=None, days=None):
+        if start is not None or end is not None:
+            window = self.dates.slice_indexer(start, end)
+        else:
+            window = slice(None)
+
+        if days is not None:
+            stop = window.stop if window.stop is not None else len(self.dates)
+            window = slice(max(stop - days, window.start or 0), stop)
+
+        return window
+
+    def _series_rows(self, state=None, series=None):
+        if series is not None:
+            if isinstance(self.series, pd.MultiIndex):
+                wanted = pd.MultiIndex.from_tuples(list(series))
+            else:
+                wanted = pd.Index([s[0] if isinstance(s, tuple) else s for s in series])
+
+            positions = self.series.get_indexer(wanted)
+            positions = positions[positions >= 0]
+
+            # An adjacent ascending run is still a view
+            if len(positions) and np.array_equal(positions, np.arange(positions[0], positions[0] + len(positions))):
+                return slice(positions[0], positions[0] + len(positions))
+            return positions
+
+        if state is None:
+            return slice(None)
+
+        try:
+            rows = self.series.get_loc(state)
+        except KeyError:
+            return slice(0, 0)
+
+        return slice(rows, rows + 1) if isinstance(rows, (int, np.integer)) else rows
+
+    def window(self, column, start=None, end=None, days=None, state=None, series=None):
+        """
+        (values, series, dates) for a date range (inclusive start / end),
+        the last `days` of it, and optionally one state or a list of
+        series keys. values is float32 with NaN for missing days.
+        """
+        rows = self._series_rows(state, series)
+        days_slice = self._day_slice(start, end, days)
+
+        return self.array(column)[rows, days_slice], self.series[rows], self.dates[days_slice]
+
+    def history_matrix(self, column="severity_index", **selection):
+        """
+        Same (values, series, dates) layout as
+        models.timeseries_forecast.history_matrix, for forecast_matrix.
+        """
+        return self.window(column, **selection)
+
+    def frame(self, columns=None, **selection):
+        """
+        Long frame (keys, date, columns) of a window, without rows where
+        every column is missing; for stages that take dated rows, e.g.
+        calculate_risk_momentum(store.frame(days=7)).
+        """
+        columns = list(self.columns) if columns is None else list(columns)
+
+        blocks = {}
+        for column in columns:
+            values, series, dates = self.window(column, **selection)
+            blocks[column] = values.ravel()
+
+        keys = series.to_frame(index=False)
+
+        long = keys.loc[keys.index.repeat(len(dates))].reset_index(drop=True)
+        long["date"] = np.tile(dates.strftime("%Y-%m-%d"), len(series))
+        for column, values in blocks.items():
+            long[column] = values.astype(float)
+
+        return long.dropna(subset=columns, how="all").reset_index(drop=True)
@@ -0,0 +1,237 @@
+"""
+Time and peak-memory benchmarks for every pipeline stage.
+
+    python -m benchmarks.run_benchmarks --sizes 100 10000 --states 5 30 \
+        --output bench.json --compare baseline.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+from benchmarks.synthetic import generate_synthetic_frame
+from backend.impact_projection import project_7day_impact
+from backend.risk_momentum import calculate_risk_momentum
+from models.forecast_model import forecast_7_day_trend
+from models.timeseries_forecast import forecast_cities
+from models.risk_model import calculate_risk_score
+from models.severity_model import calculate_severity_index as model_severity_index
+from simulation.spread_simulation import simulate_spread
+from utils.compact_frame import compact_frame
+from utils.alert_engine import generate_alerts
+from utils.reliability import calculate_reliability
+from utils.severity_index import calculate_severity_index as utils_severity_index
+from utils.source_estimation import clear_source_cache, estimate_pollution_source
+from utils.urban_rural_analysis import classify_urban_rural, compare_urban_rural
+
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+DEFAULT_STATES = [5, 30]
+
+
+def run_full_chain(df):
+    """
+    The dashboard pipeline end to end (without rendering).
+    """
+    clear_source_cache()
+
+    df = model_severity_index(df)
+    df = forecast_7_day_trend(df)
+    df = calculate_risk_score(df)
+    reliability = calculate_reliability(df)
+
+    source = estimate_pollution_source(df)
+
+    df = simulate_spread(
+        df,
+        source["source_latitude"],
+        source["source_longitude"],
+        wind_direction=90,
+        wind_strength=0.3
+    )
+    df = calculate_risk_momentum(df)
+    df = project_7day_impact(df)
+
+    alerts = generate_alerts(df, reliability)
+    comparison = compare_urban_rural(classify_urban_rural(df))
+
+    return alerts, comparison
+
+
+def build_context(raw):
+    """
+    Inputs each stage expects, prepared once per dataset (not timed).
+    """
+    severity = model_severity_index(raw)
+    source = estimate_pollution_source(severity)
+    spread = simulate_spread(
+        severity, source["source_latitude"], source["source_longitude"],
+        wind_direction=90, wind_strength=0.3
+    )
+    momentum = calculate_risk_momentum(spread.copy())
+
+    return {
+        "raw": raw,
+        "severity": severity,
+        "source": source,
+        "spread": spread,
+        "momentum": momentum,
+        "reliability": calculate_reliability(raw),
+    }
+
+
+def _source_setup(ctx):
+    clear_source_cache()
+    return (ctx["severity"],)
+
+
+# (name, setup(ctx) -> args, stage function); setup runs before every
+# repeat and is excluded from the measurement.
+STAGES = [
+    ("calculate_severity_index[utils]", lambda ctx: (ctx["raw"],), utils_severity_index),
+    ("calculate_severity_index[models]", lambda ctx: (ctx["raw"],), model_severity_index),
+    ("estimate_pollution_source", _source_setup, estimate_pollution_source),
+    ("forecast_cities[linear]", lambda ctx: (ctx["severity"],), forecast_cities),
+    ("forecast_cities[ar]", lambda ctx: (ctx["severity"], 7, "ar"), forecast_cities),
+    (
+        "simulate_spread",
+        lambda ctx: (ctx["severity"], ctx["source"]["source_latitude"], ctx["source"]["source_longitude"]),
+        simulate_spread
+    ),
+    ("calculate_risk_momentum", lambda ctx: (ctx["spread"].copy(),), calculate_risk_momentum),
+    ("project_7day_impact", lambda ctx: (ctx["momentum"].copy(),), project_7day_impact),
+    ("generate_alerts", lambda ctx: (ctx["spread"], ctx["reliability"]), generate_alerts),
+    ("classify_urban_rural", lambda ctx: (ctx["spread"],), classify_urban_rural),
+    ("full_chain", lambda ctx: (ctx["raw"],), run_full_chain),
+    ("full_chain[compact]", lambda ctx: (compact_frame(ctx["raw"]),), run_full_chain),
+]
+
+
+def measure(setup, func, ctx, repeat):
+    """
+    Wall time of `repeat` runs plus peak traced memory of one extra run
+    (tracemalloc is kept out of the timed runs because of its overhead).
+    """
+    times = []
+    for _ in range(repeat):
+        args = setup(ctx)
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+
+    args = setup(ctx)
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "seconds_min": min(times),
+        "seconds_median": statistics.median(times),
+        "peak_memory_bytes": peak,
+    }
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, states=DEFAULT_STATES, repeat=3, stages=None, seed=42):
+    results = []
+
+    for n_rows in sizes:
+        for n_states in states:
+            raw = generate_synthetic_frame(n_rows, n_states=n_states, seed=seed)
+            ctx = build_context(raw)
+
+            for name, setup, func in STAGES:
+                if stages and name not in stages:
+                    continue
+
+                result = measure(setup, func, ctx, repeat)
+                result.update({"stage": name, "rows": n_rows, "states": n_states})
+                results.append(result)
+
+                print(
+                    f"{name:<36} rows={n_rows:<9} states={n_states:<4} "
+                    f"{result['seconds_median'] * 1000:10.2f} ms "
+                    f"{result['peak_memory_bytes'] / 2**20:10.1f} MiB",
+                    file=sys.stderr
+                )
+
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "scikit-learn": sklearn.__version__,
+        },
+        "repeat": repeat,
+        "seed": seed,
+        "results": results,
+    }
+
+
+def compare_results(current, baseline, tolerance=1.25):
+    """
+    Stages whose median time grew by more than `tolerance`x against the
+    baseline report for the same (stage, rows, states).
+    """
+    previous = {
+        (r["stage"], r["rows"], r["states"]): r for r in baseline["results"]
+    }
+
+    regressions = []
+    for result in current["results"]:
+        old = previous.get((result["stage"], result["rows"], result["states"]))
+        if old is None or old["seconds_median"] == 0:
+            continue
+
+        ratio = result["seconds_median"] / old["seconds_median"]
+        if ratio > tolerance:
+            regressions.append({
+                "stage": result["stage"],
+                "rows": result["rows"],
+                "states": result["states"],
+                "ratio": round(ratio, 3),
+            })
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline stage benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--states", type=int, nargs="+", default=DEFAULT_STATES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--stages", nargs="+", default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="write JSON results here (default: stdout)")
+    parser.add_argument("--compare", default=None, help="baseline JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=1.25)
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.sizes, args.states, args.repeat, args.stages, args.seed)
+
+    exit_code = 0
+    if args.compare:
+        with open(args.compare) as f:
+            report["regressions"] = compare_results(report, json.load(f), args.tolerance)
+        exit_code = 1 if report["regressions"] else 0
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
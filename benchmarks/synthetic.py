@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+METRO_NAMES = ['Delhi', 'Mumbai', 'Kolkata', 'Chennai', 'Bengaluru', 'Hyderabad', 'Pune', 'Ahmedabad']
+
+
+def generate_synthetic_frame(n_rows, n_states=10, n_days=7, seed=42, start_date="2025-01-01"):
+    """
+    Seeded station/date frame shaped like cleaned_aqi_with_coords.csv:
+    state, city, date, NO2, PM10, PM2.5, latitude, longitude.
+
+    Cities are scattered around a centre per state inside India's
+    bounding box; every 20th city carries a metro name so the
+    urban/rural split sees both classes.
+    """
+    rng = np.random.default_rng(seed)
+
+    n_days = max(1, min(n_days, n_rows))
+    n_cities = int(np.ceil(n_rows / n_days))
+    n_states = max(1, min(n_states, n_cities))
+
+    # State centres and city coordinates
+    state_lat = rng.uniform(9, 32, n_states)
+    state_lon = rng.uniform(70, 92, n_states)
+
+    city_state = rng.integers(0, n_states, n_cities)
+    city_state[:n_states] = np.arange(n_states)
+
+    city_lat = state_lat[city_state] + rng.normal(0, 1.0, n_cities)
+    city_lon = state_lon[city_state] + rng.normal(0, 1.0, n_cities)
+
+    city_names = np.array([f"City_{i:07d}" for i in range(n_cities)], dtype=object)
+    metro = np.arange(n_cities) % 20 == 0
+    city_names[metro] = [
+        f"{METRO_NAMES[i % len(METRO_NAMES)]} {i:07d}" for i in np.flatnonzero(metro)
+    ]
+
+    state_names = np.array([f"State_{i:03d}" for i in range(n_states)], dtype=object)
+
+    # City-major layout: every city has n_days consecutive dates
+    city_index = np.repeat(np.arange(n_cities), n_days)[:n_rows]
+    day_index = np.tile(np.arange(n_days), n_cities)[:n_rows]
+
+    dates = pd.date_range(start_date, periods=n_days, freq="D").strftime("%Y-%m-%d").to_numpy()
+
+    # Skewed pollutant levels roughly matching the CPCB sample
+    base = rng.lognormal(0, 0.5, n_cities)[city_index]
+
+    return pd.DataFrame({
+        "state": state_names[city_state[city_index]],
+        "city": city_names[city_index],
+        "date": dates[day_index],
+        "NO2": np.round(rng.lognormal(3.0, 0.6, n_rows) * base, 1),
+        "PM10": np.round(rng.lognormal(4.2, 0.5, n_rows) * base, 1),
+        "PM2.5": np.round(rng.lognormal(3.6, 0.6, n_rows) * base, 1),
+        "latitude": city_lat[city_index],
+        "longitude": city_lon[city_index],
+    })
@@ -0,0 +1,32 @@
+import pandas as pd
+
+from backend.columnar_store import STORE_PATH, load_station_coordinates, write_store
+from backend.streaming_ingest import STATION_KEYS
+from backend.timeseries_store import STATION_TIMESERIES_PATH, TIMESERIES_PATH, write_timeseries
+
+# Load cleaned dataset (output of clean_aqi.py)
+cleaned_df = pd.read_csv("data/cleaned_aqi_data.csv")
+
+# One lat/long per city from the raw export, joined at write time
+raw_coords = load_station_coordinates("data/AQI.csv")
+
+# Write Parquet partitioned by state / month
+rows = write_store(cleaned_df, raw_coords, STORE_PATH)
+
+print("✅ Columnar store written to:", STORE_PATH)
+print("Rows:", rows)
+
+# City x day float32 matrices (memory-mapped) for history windows
+history = write_timeseries(cleaned_df, TIMESERIES_PATH)
+
+print("✅ City history store written to:", TIMESERIES_PATH)
+print("Series x days:", len(history.series), "x", len(history.dates))
+
+# Same per station (clean_aqi.py's station table), for station-level runs
+station_df = pd.read_csv("data/cleaned_aqi_station_data.csv")
+station_history = write_timeseries(
+    station_df, STATION_TIMESERIES_PATH, key=[k for k in STATION_KEYS if k != 'date']
+)
+
+print("✅ Station history store written to:", STATION_TIMESERIES_PATH)
+print("Series x days:", len(station_history.series), "x", len(station_history.dates))
@@ -1,78 +1,61 @@
-import pandas as pd
-
-# ==========================
-# STEP 1 — Load Dataset
-# ==========================
-print("Loading dataset...")
-df = pd.read_csv("AQI.csv")
-
-print("Original Shape:", df.shape)
-print("Columns:", df.columns)
-print("\nUnique Pollutants:")
-print(df['pollutant_id'].unique())
-
-
-# ==========================
-# STEP 2 — Keep Only Required Pollutants
-# ==========================
-required_pollutants = ['PM2.5', 'PM10', 'NO2']
+import sys
 
-df_filtered = df[df['pollutant_id'].isin(required_pollutants)]
-
-print("\nAfter Filtering Shape:", df_filtered.shape)
-print("Remaining Pollutants:", df_filtered['pollutant_id'].unique())
+import pandas as pd
 
+from backend.streaming_ingest import (
+    GROUP_KEYS,
+    STATION_KEYS,
+    merge_partials,
+    pivot_aggregates,
+    stream_ingest
+)
 
 # ==========================
-# STEP 3 — Convert Date
+# PATHS
 # ==========================
-print("\nConverting date column...")
-
-df_filtered['last_update'] = pd.to_datetime(df_filtered['last_update'], errors='coerce')
-df_filtered['date'] = df_filtered['last_update'].dt.date
+RAW_PATH = "data/AQI.csv"
+OUTPUT_PATH = "data/cleaned_aqi_data.csv"
+STATION_OUTPUT_PATH = "data/cleaned_aqi_station_data.csv"
 
-# Remove rows where date conversion failed
-df_filtered = df_filtered.dropna(subset=['date'])
+# Per-station partial aggregates + high-water mark kept between runs
+AGGREGATES_PATH = "data/aqi_station_aggregates.csv"
+STATE_PATH = "data/ingest_state.json"
 
 
 # ==========================
-# STEP 4 — Pivot (Long → Wide)
+# STREAMING INGEST
 # ==========================
-print("\nPivoting dataset...")
+# Reads AQI.csv in chunks, keeps PM2.5 / PM10 / NO2, parses last_update,
+# and folds per-chunk sums/counts into the stored per-station aggregates.
+# Only rows newer than the last run are read; pass --full to rebuild.
+incremental = "--full" not in sys.argv
 
-df_pivot = df_filtered.pivot_table(
-    index=['state', 'city', 'date'],
-    columns='pollutant_id',
-    values='pollutant_avg'
-).reset_index()
+print("Streaming dataset..." if incremental else "Rebuilding from full history...")
 
-print("Pivoted Shape:", df_pivot.shape)
-print(df_pivot.head())
+stations, new_rows = stream_ingest(
+    RAW_PATH,
+    STATION_OUTPUT_PATH,
+    AGGREGATES_PATH,
+    STATE_PATH,
+    incremental=incremental,
+    keys=STATION_KEYS
+)
 
-
-# ==========================
-# STEP 5 — Handle Missing Values
-# ==========================
-print("\nChecking missing values...")
-print(df_pivot.isnull().sum())
-
-# Fill missing pollutant values with median
-df_pivot['PM2.5'] = df_pivot['PM2.5'].fillna(df_pivot['PM2.5'].median())
-df_pivot['PM10'] = df_pivot['PM10'].fillna(df_pivot['PM10'].median())
-df_pivot['NO2'] = df_pivot['NO2'].fillna(df_pivot['NO2'].median())
+print("New readings ingested:", new_rows)
+print("Station Shape:", stations.shape)
 
 
 # ==========================
-# STEP 6 — Final Check
+# CITY REDUCTION
 # ==========================
-print("\nFinal Dataset Info:")
-print(df_pivot.info())
-print(df_pivot.head())
+# Sums and counts add up exactly, so the city table is the station
+# aggregates summed per city (no second pass over the raw export).
+aggregates = pd.read_csv(AGGREGATES_PATH, dtype={'date': str})
 
+cleaned = pivot_aggregates(merge_partials([aggregates], keys=GROUP_KEYS))
+cleaned.to_csv(OUTPUT_PATH, index=False)
 
-# ==========================
-# STEP 7 — Save Clean File
-# ==========================
-df_pivot.to_csv("cleaned_aqi_data.csv", index=False)
+print("Pivoted Shape:", cleaned.shape)
+print(cleaned.head())
 
-print("\n✅ Cleaned file saved as: cleaned_aqi_data.csv")
\ No newline at end of file
+print("\n✅ Cleaned files saved as:", OUTPUT_PATH, "and", STATION_OUTPUT_PATH)
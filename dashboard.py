@@ -1,3 +1,6 @@
+import os
+from contextlib import nullcontext
+
 import streamlit as st
 import pandas as pd
 import folium
@@ -5,17 +8,20 @@ import plotly.express as px
 from streamlit_folium import st_folium
 
 # Backend imports
-from utils.severity_index import calculate_severity_index
-from utils.reliability import calculate_reliability
-from utils.source_estimation import estimate_pollution_source
-from simulation.spread_simulation import simulate_spread
-from utils.alert_engine import generate_alerts
-from utils.urban_rural_analysis import classify_urban_rural, compare_urban_rural
-from backend.risk_momentum import calculate_risk_momentum
-from backend.impact_projection import project_7day_impact
-from models.severity_model import calculate_severity_index
-from models.risk_model import calculate_risk_score
-from models.forecast_model import forecast_7_day_trend
+from utils.map_layer import CLUSTER_THRESHOLD, add_cell_layer, add_station_layer
+from simulation.spatial_pyramid import level_for_zoom
+from utils.compact_frame import enable_copy_on_write
+from utils.instrumentation import StageProfiler, profiled
+from backend.pipeline import (
+    SCENARIO_MULTIPLIERS,
+    STATION_DATA_PATH,
+    available_states,
+    load_dataset,
+    run_pipeline
+)
+
+# Stages share unchanged columns instead of deep-copying the frame
+enable_copy_on_write()
 
 # ==========================
 # PAGE CONFIG
@@ -38,7 +44,7 @@ st.divider()
 # ==========================
 # LOAD DATA
 # ==========================
-df = pd.read_csv("data/cleaned_aqi_with_coords.csv")
+states = available_states("data/cleaned_aqi_with_coords.csv")
 
 
 # ==========================
@@ -67,20 +73,32 @@ st.sidebar.markdown("### Scenario Simulation")
 
 scenario = st.sidebar.selectbox(
     "Select Environmental Scenario",
-    [
-        "Normal Conditions",
-        "Industrial Surge (+30%)",
-        "High Wind Spread",
-        "Emergency Containment"
-    ]
+    list(SCENARIO_MULTIPLIERS)
 )
 st.sidebar.divider()
+
+# Station rows keep every station's own location for source and spread;
+# tables and metrics still show the (cached) per-city reduction
+resolution = "city"
+if os.path.exists(STATION_DATA_PATH):
+    st.sidebar.markdown("### 📍 Resolution")
+    resolution = st.sidebar.radio(
+        "Compute at",
+        ["City", "Station"]
+    ).lower()
+    st.sidebar.divider()
+
+st.sidebar.markdown("### 🛠 Debug")
+debug_timings = st.sidebar.checkbox("Show stage timings", value=False)
+
+# Time / rows / memory per stage, shown at the bottom of the sidebar
+profiler = StageProfiler() if debug_timings else None
 col1, col2 = st.columns(2)
 
 with col1:
     selected_state = st.selectbox(
         "Select State",
-        options=["All"] + sorted(df["state"].unique())
+        options=["All"] + states
     )
 
 with col2:
@@ -89,72 +107,48 @@ with col2:
         0.05, 0.50, 0.20, 0.05
     )
 
-if selected_state != "All":
-    df = df[df["state"] == selected_state]
+# Only the selected state's partitions are read from the store
+df = profiled(
+    profiler, "load", load_dataset,
+    "data/cleaned_aqi_with_coords.csv",
+    state=None if selected_state == "All" else selected_state,
+    compact=True,
+    resolution=resolution
+)
 
 st.divider()
 
+# Nationwide views of many stations draw pyramid cells, not stations
+nationwide_cells = selected_state == "All" and len(df) > CLUSTER_THRESHOLD
+
 
 # ==========================
 # CORE PROCESSING PIPELINE
 # ==========================
-df = calculate_severity_index(df)
-df = forecast_7_day_trend(df)
-df = calculate_risk_score(df)
-reliability = calculate_reliability(df)
-
-source = estimate_pollution_source(df)
-
-if (
-    source is None or
-    source.get("source_latitude") is None or
-    source.get("source_longitude") is None
-):
-    st.warning("Not enough valid data for this selection.")
-    st.stop()
-
-# Spread Simulation
-df = simulate_spread(
+# Stages run as a dependency graph with cached results: a control only
+# reruns the stages downstream of it, and wind moves index into a
+# precomputed sweep cube instead of recomputing the spread.
+result = run_pipeline(
     df,
-    source["source_latitude"],
-    source["source_longitude"],
-    intensity_factor=0.2,
     wind_direction=wind_direction,
-    wind_strength=wind_strength
+    wind_strength=wind_strength,
+    scenario=scenario,
+    intensity_factor=0.2,
+    sweep=True,
+    pyramid=nationwide_cells,
+    profiler=profiler
 )
-# Apply Scenario Impact
-if scenario == "Industrial Surge (+30%)":
-    df["predicted_severity"] *= 1.3
-
-elif scenario == "High Wind Spread":
-    df["predicted_severity"] *= 1.2
-
-elif scenario == "Emergency Containment":
-    df["predicted_severity"] *= 0.7
-    # Severity Classification
-def classify_severity(sev):
-    if sev > 0.8:
-        return "CRITICAL"
-    elif sev > 0.6:
-        return "HIGH"
-    elif sev > 0.4:
-        return "MODERATE"
-    else:
-        return "LOW"
-
-df["severity_label"] = df["predicted_severity"].apply(classify_severity)
-# Risk Momentum
-df = calculate_risk_momentum(df)
 
-# 7-Day Projection
-df = project_7day_impact(df)
-
-# Alerts
-alerts = generate_alerts(df, reliability)
+if result is None:
+    st.warning("Not enough valid data for this selection.")
+    st.stop()
 
-# Urban vs Rural
-classified = classify_urban_rural(df)
-comparison = compare_urban_rural(classified)
+df = result["frame"]
+reliability = result["reliability"]
+source = result["source"]
+alerts = result["alerts"]
+classified = result["classified"]
+comparison = result["comparison"]
 
 
 # =========================
@@ -207,44 +201,25 @@ st.markdown("<br>", unsafe_allow_html=True)
 
 map_col1, map_col2 = st.columns([3, 1])
 
-m = folium.Map(location=[20.5, 78.9], zoom_start=5)
+with profiler.stage("map build", rows_in=len(df)) if profiler else nullcontext():
+    m = folium.Map(location=[20.5, 78.9], zoom_start=5)
 
-def get_color(severity):
-    if severity > 1.0:
-        return "darkred"
-    elif severity > 0.7:
-        return "red"
-    elif severity > 0.4:
-        return "orange"
-    else:
-        return "green"
-# 🔥 Highlight estimated pollution source
-folium.Marker(
-    location=[source["source_latitude"], source["source_longitude"]],
-    popup="🔥 Estimated Pollution Source",
-    icon=folium.Icon(color="red", icon="fire")
-).add_to(m)
-
-for _, row in df.iterrows():
-    folium.CircleMarker(
-        location=[row["latitude"], row["longitude"]],
-      radius=5 + (row["predicted_severity"] * 15),
-       popup=f"""
-City: {row['city']}  
-State: {row['state']}  
-Severity: {round(row['predicted_severity'], 2)}
-""",
-        color=get_color(row["predicted_severity"]),
-        fill=True
+    # 🔥 Highlight estimated pollution source
+    folium.Marker(
+        location=[source["source_latitude"], source["source_longitude"]],
+        popup="🔥 Estimated Pollution Source",
+        icon=folium.Icon(color="red", icon="fire")
     ).add_to(m)
 
-folium.Marker(
-    location=[source["source_latitude"], source["source_longitude"]],
-    popup="Estimated Pollution Source",
-    icon=folium.Icon(color="blue")
-).add_to(m)
+    if nationwide_cells:
+        # A few hundred cells at the initial zoom, however many stations
+        add_cell_layer(m, result["pyramid"].cells(level_for_zoom(5)), "predicted_severity")
+    else:
+        # All stations as one styled layer
+        add_station_layer(m, result.get("stations", df), "predicted_severity")
 
-with map_col1:
+# Rendering serializes the map to HTML/JSON for the browser
+with map_col1, profiler.stage("map render", rows_in=len(df)) if profiler else nullcontext():
     st_folium(m, width=1000, height=500)
 
 with map_col2:
@@ -299,13 +274,7 @@ st.divider()
 # URBAN VS RURAL (PROFESSIONAL CHART)
 # ==========================
 st.subheader("🏙 Urban vs Rural Impact Distribution")
-if "area_type" not in df.columns:
-    severity_threshold = df["predicted_severity"].median()
-
-    df["area_type"] = df["predicted_severity"].apply(
-        lambda x: "Urban" if x >= severity_threshold else "Rural"
-    )
-area_avg = df.groupby("area_type")["predicted_severity"].mean().reset_index()
+area_avg = comparison
 
 import plotly.graph_objects as go
 
@@ -317,7 +286,7 @@ fig = go.Figure(data=[go.Pie(
 
 fig.update_traces(
     textinfo='label+percent',
-    pull=[0.05, 0.05]
+    pull=[0.05] * len(area_avg)
 )
 
 fig.update_layout(
@@ -330,4 +299,23 @@ fig.update_layout(
 st.plotly_chart(fig, use_container_width=True)
     
 st.divider()
-st.caption("Virtual Pollution Intelligence Grid • AI-driven Simulation Model • 24-Hour Hackathon Prototype")
\ No newline at end of file
+st.caption("Virtual Pollution Intelligence Grid • AI-driven Simulation Model • 24-Hour Hackathon Prototype")
+
+
+# ==========================
+# DEBUG: STAGE TIMINGS
+# ==========================
+if profiler is not None:
+    timings = profiler.summary()
+    timings["ms"] = (timings.pop("seconds") * 1000).round(2)
+    timings["peak MiB"] = (timings.pop("memory_peak_bytes") / 2**20).round(2)
+    timings["net MiB"] = (timings.pop("memory_net_bytes") / 2**20).round(2)
+
+    with st.sidebar.expander("⏱ Stage timings", expanded=True):
+        st.caption(
+            "Only stages that executed this run are listed; the rest came from cache. "
+            "Memory is process-wide (other sessions' work counts while a stage runs)."
+        )
+        st.dataframe(timings, use_container_width=True, hide_index=True)
+        st.download_button("Download JSON", profiler.to_json(), "pipeline_profile.json", "application/json")
+        st.download_button("Download Chrome trace", profiler.to_chrome_trace(), "pipeline_trace.json", "application/json")
@@ -1,12 +1,98 @@
-def forecast_7_day_trend(df, growth_factor=0.05):
+import numpy as np
+import pandas as pd
+
+from simulation.advection_diffusion import dynamics_growth
+from models.severity_model import calculate_severity_index
+from models.timeseries_forecast import forecast_cities, forecast_matrix
+from utils.compact_frame import stage_frame
+
+
+def forecast_7_day_trend(df, growth_factor=0.05, dynamics=None,
+                         history=None, method="linear", key=("state", "city"),
+                         window=None):
     """
     Simulate 7-day severity growth projection.
+
+    Pass dynamics (a dict of AdvectionDiffusionEngine options, e.g.
+    {"wind_direction": 90, "wind_speed_kmh": 12}) to take the growth
+    from 7 days of advection-diffusion instead of the constant factor.
+
+    Pass history (dated readings per city) to fit a per-city model
+    instead (method "linear", "ar" or "ewma", see
+    models.timeseries_forecast). The day-7 forecast is applied as growth
+    over each city's latest reading, since severity is normalized per
+    frame; cities without enough history keep the constant factor.
+    Adds projected_7day_lower / _upper and forecast_growth_7day.
+
+    history may also be a backend.timeseries_store.TimeSeriesStore;
+    window (days) limits the fit to the latest readings. A store keyed
+    by other series than `key` (e.g. stations for a city frame) has no
+    history for these rows, so they all keep the constant factor.
     """
 
-    df = df.copy()
+    df = stage_frame(df)
+
+    if dynamics is not None:
+        df["projected_7day_severity"] = (
+            df["severity_index"] * dynamics_growth(df, days=7, **dynamics)
+        )
+        return df
+
+    if history is not None:
+        return _apply_history_forecast(df, history, growth_factor, method, list(key), window)
 
     df["projected_7day_severity"] = (
         df["severity_index"] * (1 + growth_factor)
     )
 
-    return df
\ No newline at end of file
+    return df
+
+
+def _apply_history_forecast(df, history, growth_factor, method, keys, window=None):
+    if isinstance(history, pd.DataFrame):
+        if "severity_index" not in history.columns:
+            history = calculate_severity_index(history)
+
+        forecast = forecast_cities(history, horizon=7, method=method, key=keys, window=window)
+    elif list(history.key) != keys:
+        return _constant_forecast(df, growth_factor)
+    else:
+        # Memory-mapped store: only df's series over the last `window`
+        # days are paged in (a view when they are adjacent, e.g. a state)
+        series = df[keys].drop_duplicates().itertuples(index=False, name=None)
+        forecast = forecast_matrix(
+            *history.history_matrix("severity_index", days=window, series=series),
+            horizon=7, method=method
+        )
+    day_7 = forecast[forecast["horizon"] == 7]
+
+    rows = df[keys].merge(day_7, how="left", on=keys)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        last = rows["last_observed"].to_numpy(dtype=float)
+        growth = rows["forecast"].to_numpy(dtype=float) / last
+        lower = rows["lower"].to_numpy(dtype=float) / last
+        upper = rows["upper"].to_numpy(dtype=float) / last
+
+    fitted = np.isfinite(growth) & np.isfinite(lower) & np.isfinite(upper)
+    fallback = 1 + growth_factor
+
+    severity = df["severity_index"].to_numpy(dtype=float)
+
+    df["forecast_growth_7day"] = np.where(fitted, growth, np.nan)
+    df["projected_7day_severity"] = severity * np.where(fitted, growth, fallback)
+    df["projected_7day_lower"] = severity * np.where(fitted, lower, fallback)
+    df["projected_7day_upper"] = severity * np.where(fitted, upper, fallback)
+
+    return df
+
+
+def _constant_forecast(df, growth_factor):
+    projected = df["severity_index"].to_numpy(dtype=float) * (1 + growth_factor)
+
+    df["forecast_growth_7day"] = np.nan
+    df["projected_7day_severity"] = projected
+    df["projected_7day_lower"] = projected
+    df["projected_7day_upper"] = projected
+
+    return df
@@ -1,10 +1,14 @@
+from utils.banding import RISK_BANDS, assign_bands
+from utils.compact_frame import stage_frame
+
+
 def calculate_risk_score(df):
     """
     Combine severity and spread impact
     to calculate final risk score.
     """
 
-    df = df.copy()
+    df = stage_frame(df)
 
     if "spread_impact" in df.columns:
         df["risk_score"] = df["severity_index"] + df["spread_impact"]
@@ -12,16 +16,6 @@ def calculate_risk_score(df):
         df["risk_score"] = df["severity_index"]
 
     # Assign alert levels
-    def classify_risk(score):
-        if score > 1.0:
-            return "CRITICAL"
-        elif score > 0.7:
-            return "HIGH"
-        elif score > 0.4:
-            return "MODERATE"
-        else:
-            return "LOW"
-
-    df["alert_level"] = df["risk_score"].apply(classify_risk)
+    df["alert_level"] = assign_bands(df["risk_score"], RISK_BANDS)
 
     return df
\ No newline at end of file
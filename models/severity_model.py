@@ -1,17 +1,32 @@
 import pandas as pd
 
-def calculate_severity_index(df):
+from utils.compact_frame import stage_frame
+
+def severity_maxima(df):
+    """
+    Per-pollutant maxima used to normalize the severity index.
+    """
+    return {pollutant: df[pollutant].max() for pollutant in ("PM2.5", "PM10", "NO2")}
+
+
+def calculate_severity_index(df, maxima=None):
     """
     Calculate normalized pollution severity index
     using PM2.5, PM10, NO2 weighted scoring.
+
+    maxima (see severity_maxima) normalizes against a larger frame,
+    so a subset of rows can be scored on its own.
     """
 
-    df = df.copy()
+    df = stage_frame(df)
+
+    if maxima is None:
+        maxima = severity_maxima(df)
 
     # Normalize pollutants
-    df["pm25_norm"] = df["PM2.5"] / df["PM2.5"].max()
-    df["pm10_norm"] = df["PM10"] / df["PM10"].max()
-    df["no2_norm"] = df["NO2"] / df["NO2"].max()
+    df["pm25_norm"] = df["PM2.5"] / maxima["PM2.5"]
+    df["pm10_norm"] = df["PM10"] / maxima["PM10"]
+    df["no2_norm"] = df["NO2"] / maxima["NO2"]
 
     # Weighted severity score
     df["severity_index"] = (
@@ -0,0 +1,259 @@
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+def history_matrix(history, value_column="severity_index",
+                   key=("state", "city"), date_column="date", window=None):
+    """
+    Padded city x day matrix of a dated history frame.
+
+    Returns (values, cities, dates): values is (C, T) float64 with NaN
+    where a city has no reading that day (duplicates are averaged),
+    cities is the (Multi)Index of the keys and dates the daily axis.
+    window keeps only the last `window` days.
+    """
+    keys = list(key)
+
+    # Dates repeat for every city: parse each distinct one once
+    date_codes, unique_dates = pd.factorize(history[date_column])
+    unique_days = pd.DatetimeIndex(pd.to_datetime(unique_dates)).normalize()
+    start = unique_days.min()
+    day = np.asarray((unique_days - start).days)[date_codes]
+
+    grouped = history.groupby(keys, sort=True, observed=True)
+    codes = grouped.ngroup().to_numpy()
+    cities = grouped.size().index
+
+    n_cities = len(cities)
+    n_days = int(day.max()) + 1 if len(day) else 0
+
+    flat = codes * n_days + day
+    values = history[value_column].to_numpy(dtype=float)
+    valid = ~np.isnan(values) & (codes >= 0)
+
+    sums = np.bincount(flat[valid], weights=values[valid], minlength=n_cities * n_days)
+    counts = np.bincount(flat[valid], minlength=n_cities * n_days)
+
+    with np.errstate(invalid="ignore"):
+        matrix = (sums / counts).reshape(n_cities, n_days)
+
+    dates = pd.date_range(start, periods=n_days, freq="D")
+
+    if window is not None and n_days > window:
+        matrix = matrix[:, -window:]
+        dates = dates[-window:]
+
+    return matrix, cities, dates
+
+
+# ==========================
+# BATCHED MODELS
+# ==========================
+# Each fit takes the (C, T) matrix and returns (mean, std) of shape
+# (C, horizon): the h-step forecast past the last column and its
+# standard error. Cities that cannot be fit get NaN.
+
+def fit_linear_trend(values, horizon=7):
+    """
+    Per-city least-squares line through the observed days
+    (closed-form masked sums, no loop over cities).
+    """
+    n_days = values.shape[1]
+    observed = ~np.isnan(values)
+    weights = observed.astype(float)
+    y = np.where(observed, values, 0.0)
+    t = np.arange(n_days, dtype=float)
+
+    n = weights.sum(axis=1)
+    sum_t = weights @ t
+    sum_tt = weights @ (t * t)
+    sum_y = y.sum(axis=1)
+    sum_ty = y @ t
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t_mean = sum_t / n
+        sxx = sum_tt - n * t_mean ** 2
+
+        slope = np.where(sxx > 0, (sum_ty - n * t_mean * (sum_y / n)) / sxx, 0.0)
+        intercept = sum_y / n - slope * t_mean
+
+        fitted = intercept[:, None] + slope[:, None] * t
+        residuals = np.where(observed, values - fitted, 0.0)
+
+        dof = n - 2
+        sigma = np.sqrt((residuals ** 2).sum(axis=1) / dof)
+        sigma = np.where(dof > 0, sigma, np.nan)
+
+        future = n_days - 1 + np.arange(1, horizon + 1, dtype=float)
+
+        mean = intercept[:, None] + slope[:, None] * future
+        leverage = 1 + 1 / n[:, None] + (future - t_mean[:, None]) ** 2 / np.where(sxx > 0, sxx, np.inf)[:, None]
+        std = sigma[:, None] * np.sqrt(leverage)
+
+    return mean, std
+
+
+def fit_ar(values, horizon=7, p=2, ridge=1e-6):
+    """
+    Per-city AR(p) with intercept, fit jointly: the (p+1)x(p+1) normal
+    equations of every city are built from masked lag products and
+    solved in one batched np.linalg.solve.
+    """
+    n_cities, n_days = values.shape
+
+    if n_days <= p:
+        nan = np.full((n_cities, horizon), np.nan)
+        return nan, nan
+
+    # Design columns over target days p..T-1: [1, y(t-1), ..., y(t-p)]
+    target = values[:, p:]
+    columns = [np.ones_like(target)] + [values[:, p - lag:n_days - lag] for lag in range(1, p + 1)]
+
+    usable = ~np.isnan(target)
+    for column in columns[1:]:
+        usable &= ~np.isnan(column)
+
+    columns = [np.where(usable, c, 0.0) for c in columns]
+    target = np.where(usable, target, 0.0)
+
+    size = p + 1
+    xtx = np.empty((n_cities, size, size))
+    xty = np.empty((n_cities, size))
+    for i in range(size):
+        xty[:, i] = (columns[i] * target).sum(axis=1)
+        for j in range(i, size):
+            xtx[:, i, j] = xtx[:, j, i] = (columns[i] * columns[j]).sum(axis=1)
+
+    xtx += ridge * np.eye(size)
+    coef = np.linalg.solve(xtx, xty[..., None])[..., 0]
+
+    n = usable.sum(axis=1)
+    fitted = sum(coef[:, i, None] * columns[i] for i in range(size))
+    sse = (np.where(usable, target - fitted, 0.0) ** 2).sum(axis=1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dof = n - size
+        sigma = np.where(dof > 0, np.sqrt(sse / dof), np.nan)
+
+    # Recursive forecast from the last p (forward-filled) values
+    state = pd.DataFrame(values).ffill(axis=1).to_numpy()[:, -p:][:, ::-1].copy()
+    phi = coef[:, 1:]
+
+    mean = np.empty((n_cities, horizon))
+    for h in range(horizon):
+        step = coef[:, 0] + (phi * state).sum(axis=1)
+        mean[:, h] = step
+        state = np.concatenate([step[:, None], state[:, :-1]], axis=1)
+
+    # Interval from the MA(inf) weights psi_j of the fitted AR
+    psi = np.zeros((n_cities, horizon))
+    psi[:, 0] = 1.0
+    for j in range(1, horizon):
+        for i in range(1, min(j, p) + 1):
+            psi[:, j] += phi[:, i - 1] * psi[:, j - i]
+
+    std = sigma[:, None] * np.sqrt(np.cumsum(psi ** 2, axis=1))
+
+    unfit = n < size + 1
+    mean[unfit] = np.nan
+    std[unfit] = np.nan
+
+    return mean, std
+
+
+def fit_ewma(values, horizon=7, alpha=0.3):
+    """
+    Per-city exponentially weighted level (flat forecast), updated
+    day by day for all cities at once; missing days keep the level.
+    """
+    n_cities, n_days = values.shape
+
+    level = np.full(n_cities, np.nan)
+    sq_error = np.zeros(n_cities)
+    n_errors = np.zeros(n_cities)
+
+    for t in range(n_days):
+        y = values[:, t]
+        observed = ~np.isnan(y)
+        started = observed & ~np.isnan(level)
+
+        error = np.where(started, y - level, 0.0)
+        sq_error += error ** 2
+        n_errors += started
+
+        level = np.where(started, level + alpha * error, level)
+        level = np.where(observed & ~started, y, level)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sigma = np.where(n_errors > 0, np.sqrt(sq_error / n_errors), np.nan)
+
+    steps = np.arange(horizon)
+    mean = np.repeat(level[:, None], horizon, axis=1)
+    std = sigma[:, None] * np.sqrt(1 + steps * alpha ** 2)
+
+    return mean, std
+
+
+MODEL_FITS = {
+    "linear": fit_linear_trend,
+    "ar": fit_ar,
+    "ewma": fit_ewma,
+}
+
+
+def forecast_cities(history, horizon=7, method="linear",
+                    value_column="severity_index", key=("state", "city"),
+                    date_column="date", interval=0.9, window=None, **params):
+    """
+    1..horizon day forecasts with intervals for every city in a dated
+    history frame. One row per (city, horizon day) with forecast, lower,
+    upper and last_observed (latest value, for growth ratios).
+
+    method is "linear" (trend), "ar" (AR(p), params p / ridge) or
+    "ewma" (params alpha).
+    """
+    values, cities, dates = history_matrix(
+        history, value_column, key, date_column, window
+    )
+
+    return forecast_matrix(values, cities, dates, horizon, method, interval, **params)
+
+
+def forecast_matrix(values, cities, dates, horizon=7, method="linear",
+                    interval=0.9, **params):
+    """
+    forecast_cities on an already built (C, T) matrix, e.g. a window of
+    a memory-mapped backend.timeseries_store (only that window is read).
+    """
+    if method not in MODEL_FITS:
+        raise ValueError(f"Unknown forecast method: {method}")
+
+    values = np.asarray(values, dtype=float)
+
+    mean, std = MODEL_FITS[method](values, horizon=horizon, **params)
+
+    z = NormalDist().inv_cdf((1 + interval) / 2)
+
+    # Severity-style values are non-negative
+    lower = np.clip(mean - z * std, 0, None)
+    upper = np.clip(mean + z * std, 0, None)
+    mean = np.clip(mean, 0, None)
+
+    if len(dates):
+        last_observed = pd.DataFrame(values).ffill(axis=1).to_numpy()[:, -1]
+    else:
+        last_observed = np.full(len(cities), np.nan)
+
+    n_cities = len(cities)
+    steps = np.arange(1, horizon + 1)
+
+    result = cities.repeat(horizon).to_frame(index=False)
+    result["horizon"] = np.tile(steps, n_cities)
+    result["date"] = np.tile(dates[-1] + pd.to_timedelta(steps, unit="D"), n_cities) if len(dates) else pd.NaT
+    result["forecast"] = mean.ravel()
+    result["lower"] = lower.ravel()
+    result["upper"] = upper.ravel()
+    result["last_observed"] = np.repeat(last_observed, horizon)
+
+    return result
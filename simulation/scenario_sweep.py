@@ -0,0 +1,177 @@
+import numpy as np
+
+from simulation.spatial_index import KM_PER_DEGREE, haversine_km
+from utils.compact_frame import stage_frame
+
+DEFAULT_DIRECTIONS = np.arange(0, 360, 5)
+DEFAULT_STRENGTHS = np.round(np.arange(0, 1.01, 0.1), 1)
+
+
+class SweepCube:
+    """
+    predicted_severity for every (wind direction, wind strength,
+    scenario, row) as one float32 array of shape (D, S, M, N), plus the
+    per-row distance and base spread and the (D, N) wind alignment that
+    spread_impact is rebuilt from.
+    """
+
+    def __init__(self, values, directions, strengths, scenarios, severity,
+                 distance, base_spread, alignment):
+        self.values = values
+        self.directions = np.asarray(directions, dtype=float)
+        self.strengths = np.asarray(strengths, dtype=float)
+        self.scenarios = dict(scenarios)
+        self.severity = severity
+        self.distance = distance
+        self.base_spread = base_spread
+        self.alignment = alignment
+
+        self._scenario_index = {name: i for i, name in enumerate(self.scenarios)}
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.alignment.nbytes
+
+    def indices(self, wind_direction, wind_strength, scenario):
+        """
+        Nearest grid point (directions compared on the circle).
+        """
+        gap = np.abs((self.directions - wind_direction + 180) % 360 - 180)
+        d = int(np.argmin(gap))
+        s = int(np.argmin(np.abs(self.strengths - wind_strength)))
+        return d, s, self._scenario_index[scenario]
+
+    def lookup(self, wind_direction, wind_strength, scenario):
+        """
+        predicted_severity per row for one slider setting (a view).
+        """
+        d, s, m = self.indices(wind_direction, wind_strength, scenario)
+        return self.values[d, s, m]
+
+    def weights(self, wind_direction, wind_strength):
+        """
+        Bracketing grid points and their bilinear weights, [(d, s, w)].
+        Directions wrap around the circle; strengths are clamped to the
+        grid's range.
+        """
+        return [
+            (d, s, wd * ws)
+            for d, wd in self._direction_weights(wind_direction)
+            for s, ws in self._strength_weights(wind_strength)
+        ]
+
+    def _direction_weights(self, wind_direction):
+        count = len(self.directions)
+        if count == 1:
+            return [(0, 1.0)]
+
+        angle = wind_direction % 360
+        d = int(np.searchsorted(self.directions, angle, side="right") - 1) % count
+        following = (d + 1) % count
+
+        span = (self.directions[following] - self.directions[d]) % 360 or 360
+        t = ((angle - self.directions[d]) % 360) / span
+
+        return [(d, 1 - t), (following, t)]
+
+    def _strength_weights(self, wind_strength):
+        count = len(self.strengths)
+        if count == 1:
+            return [(0, 1.0)]
+
+        s = int(np.clip(np.searchsorted(self.strengths, wind_strength, side="right") - 1,
+                        0, count - 2))
+        span = self.strengths[s + 1] - self.strengths[s]
+        t = float(np.clip((wind_strength - self.strengths[s]) / span, 0, 1))
+
+        return [(s, 1 - t), (s + 1, t)]
+
+    def apply(self, df, wind_direction, wind_strength, scenario):
+        """
+        Same columns simulate_spread + the scenario multiplier would set,
+        read from the cube instead of recomputed. Settings between grid
+        points are interpolated linearly from the bracketing ones, so a
+        coarse grid still follows a 1 degree slider.
+        """
+        df = stage_frame(df)
+
+        m = self._scenario_index[scenario]
+
+        predicted = np.zeros(self.values.shape[-1])
+        for d, s, weight in self.weights(wind_direction, wind_strength):
+            if weight:
+                predicted += weight * self.values[d, s, m]
+
+        alignment = np.zeros(self.values.shape[-1])
+        for d, weight in self._direction_weights(wind_direction):
+            alignment += weight * self.alignment[d]
+
+        strength = sum(weight * self.strengths[s] for s, weight in self._strength_weights(wind_strength))
+
+        # Rebuilt rather than divided out of predicted_severity, which
+        # is all zeros under a 0 multiplier
+        df["distance_from_source"] = self.distance
+        df["spread_impact"] = self.base_spread * (1 + strength * alignment)
+        df["predicted_severity"] = predicted
+
+        return df
+
+
+def build_sweep_cube(df, source_lat, source_lon,
+                     scenarios,
+                     directions=DEFAULT_DIRECTIONS,
+                     strengths=DEFAULT_STRENGTHS,
+                     intensity_factor=0.2,
+                     distance_mode="euclidean"):
+    """
+    Evaluate simulate_spread's model for a whole grid of wind directions
+    x strengths x scenario multipliers in one broadcast computation.
+
+    scenarios maps scenario name -> multiplier of predicted severity.
+    Memory is D * S * M * N * 4 bytes (e.g. 72 x 11 x 4 x 10,000 rows
+    is about 127 MB).
+    """
+    latitudes = df["latitude"].to_numpy(dtype=float)
+    longitudes = df["longitude"].to_numpy(dtype=float)
+    severity = df["severity_index"].to_numpy(dtype=float)
+
+    delta_lat = latitudes - source_lat
+    delta_lon = longitudes - source_lon
+
+    if distance_mode == "euclidean":
+        distance = np.sqrt(delta_lat ** 2 + delta_lon ** 2)
+        distance = np.where(distance == 0, 0.0001, distance)
+        base_spread = intensity_factor / distance
+    elif distance_mode == "haversine":
+        distance = haversine_km(source_lat, source_lon, latitudes, longitudes)
+        distance = np.where(distance == 0, 0.0001 * KM_PER_DEGREE, distance)
+        base_spread = intensity_factor * KM_PER_DEGREE / distance
+        delta_lon = delta_lon * np.cos(np.radians((latitudes + source_lat) / 2))
+    else:
+        raise ValueError(f"Unknown distance_mode: {distance_mode}")
+
+    city_angle = np.arctan2(delta_lat, delta_lon)
+
+    directions = np.asarray(directions, dtype=float)
+    strengths = np.asarray(strengths, dtype=float)
+    multipliers = np.asarray(list(scenarios.values()), dtype=np.float32)
+
+    # (D, N) wind alignment, kept positive as in simulate_spread
+    alignment = np.clip(
+        np.cos(city_angle[None, :] - np.radians(directions)[:, None]), 0, None
+    ).astype(np.float32)
+
+    # (D, S, N) spread impact
+    spread = (
+        base_spread.astype(np.float32)[None, None, :] *
+        (1 + strengths.astype(np.float32)[None, :, None] * alignment[:, None, :])
+    )
+
+    # (D, S, M, N) predicted severity
+    values = (
+        (severity.astype(np.float32) + spread)[:, :, None, :] *
+        multipliers[None, None, :, None]
+    )
+
+    return SweepCube(values, directions, strengths, scenarios, severity,
+                     distance, base_spread, alignment)
@@ -0,0 +1,92 @@
+import numpy as np
+from sklearn.neighbors import BallTree
+
+from utils.pipeline_cache import StageCache, make_key
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Length of one degree of latitude; used to keep intensity_factor
+# on the same scale as the original degree-based distances.
+KM_PER_DEGREE = EARTH_RADIUS_KM * np.pi / 180
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance in kilometres (vectorized, broadcasts).
+    """
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2 +
+        np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class StationIndex:
+    """
+    BallTree (haversine metric) over station coordinates.
+
+    Query results are row positions in the frame the index was built
+    from, so the same frame (same row order) must be used with it.
+    Rows with missing coordinates are left out of the tree.
+    """
+
+    def __init__(self, latitudes, longitudes):
+        latitudes = np.asarray(latitudes, dtype=float)
+        longitudes = np.asarray(longitudes, dtype=float)
+
+        valid = ~(np.isnan(latitudes) | np.isnan(longitudes))
+
+        self.size = len(latitudes)
+        self.positions = np.flatnonzero(valid)
+        self.tree = None
+
+        if len(self.positions):
+            coords = np.radians(np.column_stack([
+                latitudes[valid],
+                longitudes[valid]
+            ]))
+            self.tree = BallTree(coords, metric="haversine")
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(df["latitude"].to_numpy(), df["longitude"].to_numpy())
+
+    def query_radius(self, lat, lon, radius_km):
+        """
+        Returns (row positions, distances in km) of stations within radius_km.
+        """
+        if self.tree is None:
+            return np.empty(0, dtype=int), np.empty(0)
+
+        point = np.radians([[lat, lon]])
+
+        ind, dist = self.tree.query_radius(
+            point,
+            r=radius_km / EARTH_RADIUS_KM,
+            return_distance=True
+        )
+
+        return self.positions[ind[0]], dist[0] * EARTH_RADIUS_KM
+
+    def __len__(self):
+        return self.size
+
+
+_index_cache = StageCache(maxsize=16)
+
+
+def get_station_index(df):
+    """
+    Build (once) and return the StationIndex for the frame's coordinates.
+    """
+    key = make_key(df[["latitude", "longitude"]].to_numpy(dtype=float))
+
+    index = _index_cache.get(key)
+    if index is None:
+        index = StationIndex.from_frame(df)
+        _index_cache.put(key, index)
+
+    return index
@@ -0,0 +1,196 @@
+import numpy as np
+import pandas as pd
+
+# Cell levels in bits per axis: a level-b cell spans 180 / 2**b degrees
+# of latitude and 360 / 2**b of longitude (level 8 is about 0.7 x 1.4
+# degrees, level 10 about 20 km). Codes interleave the lat/lon bits
+# (geohash-style), so a cell's parent is code >> 2.
+DEFAULT_LEVELS = (4, 6, 8, 10)
+MAX_LEVEL = 26
+
+VALUE_COLUMNS = ("severity_index", "predicted_severity")
+
+
+def _spread_bits(values):
+    v = values.astype(np.uint64) & np.uint64(0xFFFFFFFF)
+    v = (v | (v << np.uint64(16))) & np.uint64(0x0000FFFF0000FFFF)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x00FF00FF00FF00FF)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x3333333333333333)
+    v = (v | (v << np.uint64(1))) & np.uint64(0x5555555555555555)
+    return v
+
+
+def _compact_bits(values):
+    v = values.astype(np.uint64) & np.uint64(0x5555555555555555)
+    v = (v | (v >> np.uint64(1))) & np.uint64(0x3333333333333333)
+    v = (v | (v >> np.uint64(2))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    v = (v | (v >> np.uint64(4))) & np.uint64(0x00FF00FF00FF00FF)
+    v = (v | (v >> np.uint64(8))) & np.uint64(0x0000FFFF0000FFFF)
+    v = (v | (v >> np.uint64(16))) & np.uint64(0x00000000FFFFFFFF)
+    return v
+
+
+def cell_codes(latitudes, longitudes, level):
+    """
+    Integer cell code of every point at `level` (vectorized).
+    """
+    if not 0 < level <= MAX_LEVEL:
+        raise ValueError(f"level must be in 1..{MAX_LEVEL}")
+
+    cells = 1 << level
+    lat = np.asarray(latitudes, dtype=float)
+    lon = np.asarray(longitudes, dtype=float)
+
+    row = np.clip(((lat + 90) / 180 * cells).astype(np.int64), 0, cells - 1)
+    col = np.clip(((lon + 180) / 360 * cells).astype(np.int64), 0, cells - 1)
+
+    return ((_spread_bits(row) << np.uint64(1)) | _spread_bits(col)).astype(np.int64)
+
+
+def parent_codes(codes, level, parent_level):
+    return np.asarray(codes, dtype=np.int64) >> (2 * (level - parent_level))
+
+
+def cell_bounds(codes, level):
+    """
+    (south, west, north, east) of every cell code.
+    """
+    codes = np.asarray(codes, dtype=np.int64).astype(np.uint64)
+
+    row = _compact_bits(codes >> np.uint64(1)).astype(float)
+    col = _compact_bits(codes).astype(float)
+
+    lat_size = 180 / (1 << level)
+    lon_size = 360 / (1 << level)
+
+    south = row * lat_size - 90
+    west = col * lon_size - 180
+
+    return south, west, south + lat_size, west + lon_size
+
+
+def level_for_zoom(zoom, levels=DEFAULT_LEVELS):
+    """
+    Coarsest stored level whose cells are at most a few screen tiles
+    wide at a Leaflet zoom level.
+    """
+    wanted = zoom + 2
+    for level in sorted(levels):
+        if level >= wanted:
+            return level
+    return max(levels)
+
+
+class SpatialPyramid:
+    """
+    Mean / max / count of severity columns per cell and date at several
+    cell levels.
+
+    Only the finest level is aggregated from rows; coarser levels are
+    rolled up from it. update() folds in new rows (append-only: sums,
+    counts and maxima only grow), touching cells rather than stations.
+    """
+
+    def __init__(self, levels=DEFAULT_LEVELS, value_columns=VALUE_COLUMNS, date_column="date"):
+        self.levels = tuple(sorted(levels))
+        self.value_columns = list(value_columns)
+        self.date_column = date_column
+        self.rows = 0
+        self._tables = {level: None for level in self.levels}
+
+    def _keys(self, df):
+        return ["cell", "date"] if self.date_column in df.columns else ["cell"]
+
+    def _aggregations(self):
+        spec = {}
+        for column in self.value_columns:
+            spec[f"{column}_sum"] = "sum"
+            spec[f"{column}_max"] = "max"
+            spec[f"{column}_count"] = "sum"
+        return spec
+
+    def update(self, df):
+        columns = [c for c in self.value_columns if c in df.columns]
+
+        lat = df["latitude"].to_numpy(dtype=float)
+        lon = df["longitude"].to_numpy(dtype=float)
+        valid = ~(np.isnan(lat) | np.isnan(lon))
+
+        finest = max(self.levels)
+        rows = pd.DataFrame({"cell": cell_codes(lat[valid], lon[valid], finest)})
+        if self.date_column in df.columns:
+            rows["date"] = df[self.date_column].to_numpy()[valid]
+        for column in columns:
+            rows[column] = df[column].to_numpy(dtype=float)[valid]
+
+        keys = self._keys(rows)
+        named = {}
+        for column in columns:
+            named[f"{column}_sum"] = (column, "sum")
+            named[f"{column}_max"] = (column, "max")
+            named[f"{column}_count"] = (column, "count")
+
+        batch = rows.groupby(keys, sort=False).agg(**named).reset_index()
+
+        previous = finest
+        for level in sorted(self.levels, reverse=True):
+            if level != previous:
+                # Roll the finer level's cells up into their parents
+                batch = batch.assign(cell=parent_codes(batch["cell"], previous, level))
+                batch = self._combine([batch], keys)
+                previous = level
+
+            table = self._tables[level]
+            self._tables[level] = self._combine([table, batch], keys) if table is not None else batch
+
+        self.rows += int(valid.sum())
+        return self
+
+    def _combine(self, tables, keys):
+        spec = {k: v for k, v in self._aggregations().items() if k in tables[-1].columns}
+        return (
+            pd.concat(tables, ignore_index=True)
+            .groupby(keys, sort=False)
+            .agg(spec)
+            .reset_index()
+        )
+
+    def cells(self, level, date=None):
+        """
+        Per-cell summary at `level`: centre, bounds, and mean / max /
+        count of every value column. With a date, that day only; without
+        one, all dates are combined.
+        """
+        table = self._tables[level]
+        if table is None:
+            return pd.DataFrame(columns=["cell", "latitude", "longitude"])
+
+        if "date" in table.columns:
+            if date is not None:
+                table = table[table["date"] == date].drop(columns="date")
+            else:
+                table = self._combine([table.drop(columns="date")], ["cell"])
+
+        summary = table[["cell"]].copy()
+
+        south, west, north, east = cell_bounds(table["cell"].to_numpy(), level)
+        summary["latitude"] = (south + north) / 2
+        summary["longitude"] = (west + east) / 2
+        summary["south"], summary["west"] = south, west
+        summary["north"], summary["east"] = north, east
+
+        for column in self.value_columns:
+            if f"{column}_sum" not in table.columns:
+                continue
+            count = table[f"{column}_count"].to_numpy(dtype=float)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                summary[f"{column}_mean"] = table[f"{column}_sum"].to_numpy() / count
+            summary[f"{column}_max"] = table[f"{column}_max"].to_numpy()
+            summary[f"{column}_count"] = count.astype(np.int64)
+
+        return summary.reset_index(drop=True)
+
+
+def build_pyramid(df, levels=DEFAULT_LEVELS, value_columns=VALUE_COLUMNS, date_column="date"):
+    return SpatialPyramid(levels, value_columns, date_column).update(df)
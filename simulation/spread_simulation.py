@@ -1,19 +1,44 @@
 import numpy as np
 import pandas as pd
 
+from simulation.spatial_index import KM_PER_DEGREE, haversine_km, get_station_index
+from utils.compact_frame import stage_frame
+
 
 def simulate_spread(df, source_lat, source_lon,
                     intensity_factor=0.2,
                     wind_direction=0,
-                    wind_strength=0.0):
-
-    df = df.copy()
+                    wind_strength=0.0,
+                    distance_mode="euclidean",
+                    radius_km=None,
+                    index=None):
+    """
+    distance_mode="euclidean" measures distance in raw degrees (original model).
+    distance_mode="haversine" measures great-circle km; with radius_km set,
+    only stations found by the spatial index within the radius are evaluated
+    and every other station gets zero spread impact.
+    """
+
+    df = stage_frame(df)
 
     if source_lat is None or source_lon is None:
         df["spread_impact"] = 0
         df["distance_from_source"] = 0
         return df
 
+    if distance_mode == "haversine":
+        return _simulate_spread_haversine(
+            df, source_lat, source_lon,
+            intensity_factor, wind_direction, wind_strength,
+            radius_km, index
+        )
+
+    if distance_mode != "euclidean":
+        raise ValueError(f"Unknown distance_mode: {distance_mode}")
+
+    if radius_km is not None:
+        raise ValueError("radius_km requires distance_mode='haversine'")
+
     # Step 1: Distance calculation
     df["distance_from_source"] = np.sqrt(
         (df["latitude"] - source_lat) ** 2 +
@@ -28,30 +53,179 @@ def simulate_spread(df, source_lat, source_lon,
     )
 
     # Step 3: Wind directional influence
+    delta_lat = df["latitude"] - source_lat
+    delta_lon = df["longitude"] - source_lon
+
+    wind_effect = _wind_effect(delta_lat, delta_lon, wind_direction, wind_strength)
+
+    # Final spread impact
+    df["spread_impact"] = base_spread * (1 + wind_effect)
+
+    # Final predicted severity
+    df["predicted_severity"] = (
+        df["severity_index"] + df["spread_impact"]
+    )
+
+    return df
+
+
+def _wind_effect(delta_lat, delta_lon, wind_direction, wind_strength):
+
     # Convert wind direction to radians
     wind_rad = np.radians(wind_direction)
 
     # Compute angle between source and each city
-    delta_lat = df["latitude"] - source_lat
-    delta_lon = df["longitude"] - source_lon
-
     city_angle = np.arctan2(delta_lat, delta_lon)
 
     # Wind alignment factor (cosine similarity)
     wind_alignment = np.cos(city_angle - wind_rad)
 
     # Normalize alignment (keep only positive influence)
-    wind_alignment = wind_alignment.clip(lower=0)
+    wind_alignment = np.clip(wind_alignment, 0, None)
 
     # Apply wind strength
-    wind_effect = wind_strength * wind_alignment
+    return wind_strength * wind_alignment
+
+
+def _simulate_spread_haversine(df, source_lat, source_lon,
+                               intensity_factor, wind_direction, wind_strength,
+                               radius_km, index):
+
+    latitudes = df["latitude"].to_numpy(dtype=float)
+    longitudes = df["longitude"].to_numpy(dtype=float)
+
+    # Step 1: Candidate stations (all, or only those inside the radius)
+    if radius_km is None:
+        positions = np.arange(len(df))
+        distance_km = haversine_km(
+            source_lat, source_lon, latitudes, longitudes
+        )
+    else:
+        if index is None:
+            index = get_station_index(df)
+        positions, distance_km = index.query_radius(
+            source_lat, source_lon, radius_km
+        )
+
+    distance_km = np.where(distance_km == 0, 0.0001 * KM_PER_DEGREE, distance_km)
+
+    # Step 2: Base inverse distance impact (intensity_factor stays per-degree)
+    base_spread = intensity_factor * KM_PER_DEGREE / distance_km
+
+    # Step 3: Wind influence on a local east/north projection
+    delta_lat = latitudes[positions] - source_lat
+    delta_lon = (
+        (longitudes[positions] - source_lon) *
+        np.cos(np.radians((latitudes[positions] + source_lat) / 2))
+    )
 
-    # Final spread impact
-    df["spread_impact"] = base_spread * (1 + wind_effect)
+    wind_effect = _wind_effect(delta_lat, delta_lon, wind_direction, wind_strength)
+
+    distance = np.full(len(df), np.nan)
+    spread = np.zeros(len(df))
+
+    distance[positions] = distance_km
+    spread[positions] = base_spread * (1 + wind_effect)
+
+    df["distance_from_source"] = distance
+    df["spread_impact"] = spread
+
+    df["predicted_severity"] = (
+        df["severity_index"] + df["spread_impact"]
+    )
+
+    return df
+
+
+def simulate_multi_source_spread(df, sources,
+                                 intensities=None,
+                                 intensity_factor=0.2,
+                                 wind_direction=0,
+                                 wind_strength=0.0,
+                                 distance_mode="euclidean",
+                                 combine="sum"):
+    """
+    Spread from K sources at once.
+
+    sources: (lat, lon) pairs, or dicts as returned by estimate_pollution_sources.
+    intensities: per-source multiplier of intensity_factor (default 1 each).
+    The K x N impact matrix is computed in one broadcast pass and reduced
+    per city with combine="sum" or combine="max".
+    """
+
+    df = stage_frame(df)
+
+    source_lat, source_lon = _source_coordinates(sources)
+
+    if len(source_lat) == 0:
+        df["spread_impact"] = 0
+        df["distance_from_source"] = 0
+        return df
+
+    if intensities is None:
+        intensities = np.ones(len(source_lat))
+    intensities = np.asarray(intensities, dtype=float)
+
+    if intensities.shape != source_lat.shape:
+        raise ValueError("intensities must have one value per source")
+
+    if combine not in ("sum", "max"):
+        raise ValueError(f"Unknown combine mode: {combine}")
+
+    latitudes = df["latitude"].to_numpy(dtype=float)[None, :]
+    longitudes = df["longitude"].to_numpy(dtype=float)[None, :]
+    source_lat = source_lat[:, None]
+    source_lon = source_lon[:, None]
+
+    # K x N distances and wind geometry
+    delta_lat = latitudes - source_lat
+    delta_lon = longitudes - source_lon
+
+    if distance_mode == "euclidean":
+        distance = np.sqrt(delta_lat ** 2 + delta_lon ** 2)
+        distance = np.where(distance == 0, 0.0001, distance)
+        scale = 1.0
+    elif distance_mode == "haversine":
+        distance = haversine_km(source_lat, source_lon, latitudes, longitudes)
+        distance = np.where(distance == 0, 0.0001 * KM_PER_DEGREE, distance)
+        delta_lon = delta_lon * np.cos(np.radians((latitudes + source_lat) / 2))
+        scale = KM_PER_DEGREE
+    else:
+        raise ValueError(f"Unknown distance_mode: {distance_mode}")
+
+    wind_effect = _wind_effect(delta_lat, delta_lon, wind_direction, wind_strength)
+
+    impact = (
+        (intensity_factor * scale * intensities[:, None]) / distance *
+        (1 + wind_effect)
+    )
+
+    if combine == "sum":
+        df["spread_impact"] = impact.sum(axis=0)
+    else:
+        df["spread_impact"] = impact.max(axis=0)
+
+    df["distance_from_source"] = distance.min(axis=0)
+    df["dominant_source"] = impact.argmax(axis=0)
 
-    # Final predicted severity
     df["predicted_severity"] = (
         df["severity_index"] + df["spread_impact"]
     )
 
-    return df
\ No newline at end of file
+    return df
+
+
+def _source_coordinates(sources):
+
+    latitudes = []
+    longitudes = []
+
+    for source in sources:
+        if isinstance(source, dict):
+            lat, lon = source["source_latitude"], source["source_longitude"]
+        else:
+            lat, lon = source
+        latitudes.append(lat)
+        longitudes.append(lon)
+
+    return np.asarray(latitudes, dtype=float), np.asarray(longitudes, dtype=float)
@@ -0,0 +1,82 @@
+import asyncio
+import json
+import threading
+from http import HTTPStatus
+
+import pytest
+
+from backend.api_server import ApiService
+
+
+@pytest.fixture
+def service():
+    service = ApiService()
+    yield service
+    service.close()
+
+
+def _get(service, target, headers=None):
+    return asyncio.run(service.handle("GET", target, headers or {}))
+
+
+def test_etag_round_trip_returns_not_modified(service):
+    status, headers, body = _get(service, "/alerts?state=Delhi")
+
+    assert status == HTTPStatus.OK
+    assert json.loads(body)["params"]["state"] == "Delhi"
+
+    status, _, body = _get(service, "/alerts?state=Delhi", {"if-none-match": headers["ETag"]})
+
+    assert status == HTTPStatus.NOT_MODIFIED
+    assert body == b""
+
+    status, _, _ = _get(service, "/alerts?state=Delhi", {"if-none-match": '"stale"'})
+
+    assert status == HTTPStatus.OK
+
+
+def test_concurrent_requests_share_one_computation(service):
+    # Held until every request is waiting, so none can finish first
+    release = threading.Event()
+    run = service._run
+
+    def slow_run(params):
+        release.wait(timeout=30)
+        return run(params)
+
+    service._run = slow_run
+
+    async def burst():
+        requests = [
+            service.handle("GET", f"{path}?state=Punjab&wind_direction=45", {})
+            for path in ["/alerts", "/spread", "/projection", "/urban-rural"] * 5
+        ]
+        gathered = asyncio.gather(*requests)
+        await asyncio.sleep(0.2)
+        release.set()
+        return await gathered
+
+    responses = asyncio.run(burst())
+
+    assert {status for status, _, _ in responses} == {HTTPStatus.OK}
+    assert service.computations == 1
+
+
+@pytest.mark.parametrize("query, message", [
+    ("state=Atlantis", "Unknown state"),
+    ("scenario=Meteor", "Unknown scenario"),
+    ("wind_direction=north", "wind_direction must be a number"),
+    ("wind_strength=2", "wind_strength must be between"),
+])
+def test_invalid_parameters_are_rejected(service, query, message):
+    status, _, body = _get(service, f"/spread?{query}")
+
+    assert status == HTTPStatus.BAD_REQUEST
+    assert message in json.loads(body)["error"]
+    assert service.computations == 0
+
+
+def test_unknown_endpoint_is_not_found(service):
+    status, _, _ = _get(service, "/forecast")
+
+    assert status == HTTPStatus.NOT_FOUND
@@ -0,0 +1,184 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+from backend.live_ingest import (
+    CITY_KEYS,
+    LiveIngestService,
+    StubFeedServer,
+    csv_records,
+    fetch_page
+)
+from backend.streaming_ingest import REQUIRED_POLLUTANTS, aggregate_chunk, pivot_aggregates
+from models.severity_model import calculate_severity_index
+from simulation.spread_simulation import simulate_spread
+from utils.banding import SEVERITY_BANDS, assign_bands
+from utils.source_estimation import estimate_pollution_source
+
+COMPARED = ["date"] + REQUIRED_POLLUTANTS + [
+    "severity_index", "spread_impact", "predicted_severity", "severity_label"
+]
+
+
+def _feed_records():
+    """
+    Raw rows of cities reporting every required pollutant, so the
+    median fill (which legitimately differs between the two paths)
+    never kicks in.
+    """
+    records = pd.DataFrame(csv_records("data/AQI.csv"))
+    records = records[
+        records["pollutant_id"].isin(REQUIRED_POLLUTANTS) &
+        pd.to_numeric(records["pollutant_avg"], errors="coerce").notna()
+    ]
+    complete = records.groupby(CITY_KEYS)["pollutant_id"].transform("nunique") == len(REQUIRED_POLLUTANTS)
+    return records[complete].to_dict("records")
+
+
+def _full_recompute(records):
+    """
+    The whole pipeline over every record at once.
+    """
+    raw = pd.DataFrame.from_records(records)
+    raw = raw.drop_duplicates(["state", "city", "station", "pollutant_id", "last_update"])
+
+    partial, _ = aggregate_chunk(raw)
+    df = pivot_aggregates(partial)
+    df = df.sort_values("date").drop_duplicates(CITY_KEYS, keep="last")
+
+    coordinates = raw[CITY_KEYS + ["latitude", "longitude"]].drop_duplicates(CITY_KEYS)
+    coordinates = coordinates.astype({"latitude": float, "longitude": float})
+    df = df.merge(coordinates, on=CITY_KEYS, how="left")
+
+    df = calculate_severity_index(df.sort_values(CITY_KEYS, ignore_index=True))
+    source = estimate_pollution_source(df)
+    df = simulate_spread(df, source["source_latitude"], source["source_longitude"],
+                         intensity_factor=0.2, wind_direction=90, wind_strength=0.3)
+    df["severity_label"] = assign_bands(df["predicted_severity"], SEVERITY_BANDS)
+
+    return df, source
+
+
+def _sorted(df):
+    return df.sort_values(CITY_KEYS)[CITY_KEYS + COMPARED].reset_index(drop=True)
+
+
+def _assert_matches_full(service, records):
+    expected, source = _full_recompute(records)
+    snapshot = service.snapshot()
+
+    assert snapshot["source"]["source_latitude"] == source["source_latitude"]
+    assert snapshot["source"]["source_longitude"] == source["source_longitude"]
+    pd.testing.assert_frame_equal(
+        _sorted(snapshot["frame"]), _sorted(expected), check_dtype=False, rtol=1e-9
+    )
+
+
+def _next_day(records, cities, scale):
+    """
+    Next-day readings for some cities, pollutant values scaled.
+    """
+    later = []
+    for record in records:
+        if (record["state"], record["city"]) in cities:
+            value = float(record["pollutant_avg"]) * scale
+            later.append(dict(
+                record,
+                last_update=record["last_update"].replace("19-05-2025", "20-05-2025"),
+                pollutant_avg=str(value)
+            ))
+    return later
+
+
+@pytest.fixture
+def feed():
+    records = _feed_records()
+    server = StubFeedServer(records).start()
+    yield server, records
+    server.stop()
+
+
+def _service(url, **options):
+    # One page in flight, so pages arrive in feed order and each city
+    # keeps the coordinates of its first record (as add_coordinates.py)
+    return LiveIngestService(url, page_size=250, max_concurrency=1, poll_interval=0, **options)
+
+
+def _poll(service, polls=1):
+    asyncio.run(service.run(polls=polls))
+
+
+def test_first_poll_matches_full_recompute(feed):
+    server, records = feed
+    service = _service(server.url)
+
+    _poll(service)
+
+    _assert_matches_full(service, records)
+
+
+def test_new_maximum_matches_full_recompute(feed):
+    server, records = feed
+    service = _service(server.url)
+    _poll(service)
+
+    quiet = service.snapshot()["frame"].nsmallest(3, "severity_index")
+    cities = set(quiet[CITY_KEYS].itertuples(index=False, name=None))
+    later = _next_day(records, cities, scale=50)
+    server.add_records(later)
+
+    _poll(service)
+
+    assert service._maxima["PM2.5"] > max(float(r["pollutant_avg"]) for r in records if r["pollutant_id"] == "PM2.5")
+    _assert_matches_full(service, records + later)
+
+
+def test_lowered_maximum_matches_full_recompute(feed):
+    server, records = feed
+    service = _service(server.url)
+    _poll(service)
+
+    before = dict(service._maxima)
+    frame = service.snapshot()["frame"]
+    cities = {
+        tuple(frame.loc[frame[pollutant].idxmax(), CITY_KEYS])
+        for pollutant in REQUIRED_POLLUTANTS
+    }
+    later = _next_day(records, cities, scale=0.1)
+    server.add_records(later)
+
+    _poll(service)
+
+    assert all(service._maxima[p] < before[p] for p in REQUIRED_POLLUTANTS)
+    _assert_matches_full(service, records + later)
+
+
+def test_repeated_poll_changes_nothing(feed):
+    server, records = feed
+    service = _service(server.url)
+
+    _poll(service)
+    version = service.version
+    _poll(service)
+
+    assert service.version == version
+    _assert_matches_full(service, records)
+
+
+def test_fetch_errors_do_not_stop_the_service(feed, capsys):
+    server, records = feed
+    calls = {"count": 0}
+
+    def flaky(url, offset, limit, params=None):
+        calls["count"] += 1
+        if calls["count"] == 1:
+            raise ConnectionError("feed unavailable")
+        return fetch_page(url, offset, limit, params)
+
+    service = _service(server.url, fetch=flaky)
+
+    _poll(service, polls=2)
+
+    assert "poll failed" in capsys.readouterr().err
+    _assert_matches_full(service, records)
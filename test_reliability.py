@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+from utils.reliability import (
+    StreamingReliability,
+    calculate_station_reliability,
+    clear_reliability_cache
+)
+
+KEYS = ["state", "city"]
+
+
+@pytest.fixture(autouse=True)
+def fresh_engines():
+    clear_reliability_cache()
+    yield
+    clear_reliability_cache()
+
+
+def _frame():
+    return pd.read_csv("data/cleaned_aqi_with_coords.csv")
+
+
+def _next_day(df, scale):
+    later = df.copy()
+    later["date"] = "2025-05-20"
+    later[["NO2", "PM10", "PM2.5"]] *= scale
+    return later
+
+
+def test_single_readings_do_not_collapse_to_one_score():
+    scores = calculate_station_reliability(_frame(), key=KEYS)
+
+    assert scores.nunique() > 1
+
+
+def test_repeated_calls_only_add_new_readings():
+    df = _frame()
+    later = _next_day(df, scale=1.5)
+
+    calculate_station_reliability(df, key=KEYS)
+    calculate_station_reliability(df, key=KEYS)
+    scores = calculate_station_reliability(pd.concat([df, later]), key=KEYS)
+
+    expected = StreamingReliability().update_frame(pd.concat([df, later]), key=KEYS).scores()
+    pd.testing.assert_series_equal(scores, expected.rename_axis(KEYS), check_exact=False)
+
+
+def test_subset_is_scored_from_the_shared_engine():
+    df = _frame()
+    everything = calculate_station_reliability(df, key=KEYS)
+
+    delhi = calculate_station_reliability(df[df["state"] == "Delhi"], key=KEYS)
+
+    assert list(delhi.index) == [("Delhi", "Delhi")]
+    assert delhi.iloc[0] == everything.loc[("Delhi", "Delhi")]
@@ -5,41 +5,52 @@ from utils.source_estimation import estimate_pollution_source
 from utils.alert_engine import generate_alerts
 from utils.urban_rural_analysis import classify_urban_rural , compare_urban_rural
 from simulation.spread_simulation import simulate_spread
-# Load cleaned dataset
-df = pd.read_csv("data/cleaned_aqi_with_coords.csv")
+from backend.pipeline import load_dataset
+from utils.instrumentation import StageProfiler
+
+# Per-stage time / rows / memory, printed at the end
+profiler = StageProfiler()
+
+# Load cleaned dataset (columnar store if built, else CSV)
+df = profiler.call("load", load_dataset)
 
 # Calculate Pollution Severity Index
-df_with_severity = calculate_severity_index(df)
+df_with_severity = profiler.call("severity", calculate_severity_index, df)
 
 print("\n--- Severity Index Preview ---")
 print(df_with_severity[['state', 'city', 'date', 'severity_index']].head())
 
 # Calculate Reliability Score
-reliability = calculate_reliability(df)
+reliability = profiler.call("reliability", calculate_reliability, df)
 
 print("\n--- Reliability Score ---")
 print("Reliability Score:", reliability)
 
 # Calculate Estimate Source
-source = estimate_pollution_source(df_with_severity)
+source = profiler.call("source estimation", estimate_pollution_source, df_with_severity)
 
 print("\n------Estimated Pollution Source Coords------")
 print(source)
 
 # Simulate Pollution Spread
-spread_df = simulate_spread(df_with_severity,
+spread_df = profiler.call("spread", simulate_spread, df_with_severity,
 source['source_longitude'], 
 source['source_latitude'] )
 print("\n------Spread Simulation Preview-----")
 print(spread_df[['state','city','predicted_severity']].head())
 
 # Smart alert engine 
-alerts = generate_alerts(spread_df, reliability)
+alerts = profiler.call("alerts", generate_alerts, spread_df, reliability)
 print("\n----- TOP ALERT PRIORITY REPORT -----")
 print(alerts)
 
 #urban vs rural comparsion
-classified_df = classify_urban_rural(spread_df)
+classified_df = profiler.call("urban/rural", classify_urban_rural, spread_df)
 comparsion = compare_urban_rural(classified_df)
 print("\n-----Urban VS Rural Pollution Comparsion")
-print(comparsion)
\ No newline at end of file
+print(comparsion)
+
+# Stage timings (export with profiler.to_json / to_chrome_trace)
+profiler.stop()
+print("\n----- STAGE TIMINGS -----")
+print(profiler.summary().to_string(index=False))
@@ -0,0 +1,81 @@
+import shutil
+
+import pandas as pd
+
+from backend.streaming_ingest import STATION_KEYS, stream_ingest
+
+
+def _ingest(tmp_path, incremental, tag):
+    return stream_ingest(
+        tmp_path / "raw.csv",
+        tmp_path / f"out_{tag}.csv",
+        tmp_path / f"aggregates_{tag}.csv",
+        tmp_path / f"state_{tag}.json",
+        chunksize=500,
+        incremental=incremental,
+        keys=STATION_KEYS
+    )
+
+
+def _append(path, lines):
+    with open(path, "a") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def _raw_lines(path):
+    with open(path) as f:
+        return f.read().splitlines()[1:]
+
+
+def _sorted(df):
+    return df.sort_values(STATION_KEYS).reset_index(drop=True)
+
+
+def _assert_matches_full(tmp_path):
+    incremental = pd.read_csv(tmp_path / "out_incremental.csv")
+    full, _ = _ingest(tmp_path, False, "full")
+    pd.testing.assert_frame_equal(_sorted(incremental), _sorted(full))
+
+
+def test_append_with_older_timestamps_is_ingested(tmp_path):
+    shutil.copy("data/AQI.csv", tmp_path / "raw.csv")
+    _, first = _ingest(tmp_path, False, "incremental")
+
+    # A late batch stamped an hour before the high-water mark
+    earlier = [
+        line.replace("19-05-2025 10:00:00", "19-05-2025 09:00:00")
+        for line in _raw_lines(tmp_path / "raw.csv")
+    ]
+    _append(tmp_path / "raw.csv", earlier)
+
+    _, added = _ingest(tmp_path, True, "incremental")
+
+    assert added == first
+    _assert_matches_full(tmp_path)
+
+
+def test_late_rows_for_the_high_water_hour_are_ingested(tmp_path):
+    shutil.copy("data/AQI.csv", tmp_path / "raw.csv")
+    _ingest(tmp_path, False, "incremental")
+
+    late = [
+        line.replace('"Rajiv Nagar', '"Late Station')
+        for line in _raw_lines(tmp_path / "raw.csv")
+        if "Rajiv Nagar" in line
+    ]
+    _append(tmp_path / "raw.csv", late)
+
+    _, added = _ingest(tmp_path, True, "incremental")
+
+    assert added > 0
+    _assert_matches_full(tmp_path)
+
+
+def test_rerun_without_new_rows_adds_nothing(tmp_path):
+    shutil.copy("data/AQI.csv", tmp_path / "raw.csv")
+    _ingest(tmp_path, False, "incremental")
+
+    _, added = _ingest(tmp_path, True, "incremental")
+
+    assert added == 0
+    _assert_matches_full(tmp_path)
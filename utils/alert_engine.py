@@ -1,32 +1,150 @@
+import numpy as np
 import pandas as pd
 
-def generate_alerts(df, reliability_score):
+from utils.banding import ALERT_BANDS, assign_bands
+
+ALERT_COLUMNS = ['state', 'city', 'risk_score', 'alert_level']
+STATION_ALERT_COLUMNS = ['state', 'city', 'station', 'risk_score', 'alert_level']
+
+
+def generate_alerts(df, reliability_score, k=10, by=None):
     """
     Generates smart priority alerts
+
+    reliability_score is either one global score or per-station scores
+    (a Series indexed by city, or by (state, city), as returned by
+    calculate_station_reliability).
+
+    Returns the k highest-risk rows, or the k highest per group when
+    `by` names grouping columns ('state', 'alert_level', ...).
+    Only the selected rows are materialized; nothing is fully sorted.
     """
 
-    df = df.copy()
+    # Base severity factor x reliability multiplier
+    reliability = row_reliability(df, reliability_score)
+    risk_score = df['predicted_severity'].to_numpy(dtype=float) * (1 + (1 - reliability))
 
-    # Base severity factor
-    df['risk_score'] = df['predicted_severity']
+    if by is None:
+        positions = top_k_positions(risk_score, k)
+    else:
+        keys = [by] if isinstance(by, str) else list(by)
+        groups = [
+            assign_bands(risk_score, ALERT_BANDS) if key == 'alert_level' else df[key].to_numpy()
+            for key in keys
+        ]
+        positions = grouped_top_k_positions(risk_score, groups, k)
 
-    # Reliability multiplier
-    df['risk_score'] = df['risk_score'] * (1 + (1 - reliability_score))
+    # Station-level frames name the station behind each alert
+    columns = STATION_ALERT_COLUMNS if 'station' in df.columns else ALERT_COLUMNS
+
+    alerts = df.iloc[positions][columns[:-2]].copy()
+    alerts['risk_score'] = risk_score[positions]
 
     # Assign alert category
-    def categorize(score):
-        if score >= 0.75:
-            return "CRITICAL"
-        elif score >= 0.5:
-            return "HIGH"
-        elif score >= 0.3:
-            return "MODERATE"
+    alerts['alert_level'] = assign_bands(alerts['risk_score'], ALERT_BANDS)
+
+    return alerts[columns]
+
+
+def top_k_positions(scores, k):
+    """
+    Positions of the k largest scores, highest first (ties keep row
+    order, NaN ranks last). Uses argpartition, so O(n + k log k).
+    """
+    scores = np.asarray(scores, dtype=float)
+    scores = np.where(np.isnan(scores), -np.inf, scores)
+
+    if k >= len(scores):
+        candidates = np.arange(len(scores))
+    elif k <= 0:
+        return np.empty(0, dtype=np.int64)
+    else:
+        # Every row tied with the k-th score competes, so the trim
+        # below keeps the earliest of them
+        kth = -np.partition(-scores, k - 1)[k - 1]
+        candidates = np.flatnonzero(scores >= kth)
+
+    order = np.lexsort((candidates, -scores[candidates]))
+
+    return candidates[order][:k]
+
+
+def grouped_top_k_positions(scores, groups, k):
+    """
+    Positions of the k largest scores within every group, in one grouped
+    pass (no loop over groups). Output is ordered by group, then rank.
+    """
+    scores = pd.Series(np.asarray(scores, dtype=float))
+    grouper = [pd.Series(g) for g in groups]
+
+    grouped = scores.groupby(grouper, sort=True, observed=True, dropna=False)
+    rank = grouped.rank(method='first', ascending=False).to_numpy()
+    group_id = grouped.ngroup().to_numpy()
+
+    positions = np.flatnonzero(rank <= k)
+    order = np.lexsort((rank[positions], group_id[positions]))
+
+    return positions[order]
+
+
+class RunningTopK:
+    """
+    Running top-k over batches that keep arriving.
+
+    Each push only selects the batch's own top k and merges it with the
+    current k rows. With key columns, a newer row for the same key
+    replaces the older one (so a station's stale score drops out); rows
+    already pushed out of the top k are not recalled when that happens.
+    """
+
+    def __init__(self, k=10, score_column='risk_score', key=None):
+        self.k = k
+        self.score_column = score_column
+        self.key = [key] if isinstance(key, str) else key
+        self.top = None
+
+    def push(self, batch):
+        if batch.empty:
+            return self.current()
+
+        candidates = batch.iloc[top_k_positions(batch[self.score_column].to_numpy(), self.k)]
+
+        if self.top is None:
+            merged = candidates
         else:
-            return "LOW"
+            current = self.top
+            if self.key:
+                refreshed = pd.MultiIndex.from_frame(batch[self.key])
+                stale = pd.MultiIndex.from_frame(current[self.key]).isin(refreshed)
+                current = current[~stale]
+            merged = pd.concat([current, candidates])
+
+        self.top = merged.iloc[top_k_positions(merged[self.score_column].to_numpy(), self.k)]
+
+        return self.current()
+
+    def current(self):
+        return self.top
+
+
+def row_reliability(df, reliability_score):
+    """
+    Reliability for every row: the global score as-is, or each row's
+    station score (stations without a score get the mean score).
+    """
+    if isinstance(reliability_score, dict):
+        reliability_score = pd.Series(reliability_score)
+
+    if not isinstance(reliability_score, pd.Series):
+        return reliability_score
+
+    keys = [name for name in reliability_score.index.names if name is not None] or ['city']
 
-    df['alert_level'] = df['risk_score'].apply(categorize)
+    if len(keys) == 1:
+        lookup = df[keys[0]]
+    else:
+        lookup = pd.MultiIndex.from_frame(df[keys])
 
-    # Rank by highest risk
-    df = df.sort_values(by='risk_score', ascending=False)
+    values = reliability_score.reindex(lookup).to_numpy(dtype=float)
 
-    return df[['state', 'city', 'risk_score', 'alert_level']].head(10)
\ No newline at end of file
+    return np.where(np.isnan(values), reliability_score.mean(), values)
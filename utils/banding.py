@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+
+class Bands:
+    """
+    Threshold bands: ascending cut points and one label per band
+    (lowest band first, so len(labels) == len(edges) + 1).
+
+    closed="right": a value moves up a band only when it is > the edge.
+    closed="left":  a value moves up a band when it is >= the edge.
+    Missing values fall into the lowest band.
+    """
+
+    def __init__(self, edges, labels, closed="right"):
+        edges = np.asarray(edges, dtype=float)
+
+        if len(labels) != len(edges) + 1:
+            raise ValueError("Need exactly one more label than edges")
+        if np.any(np.diff(edges) <= 0):
+            raise ValueError("Band edges must be strictly increasing")
+        if closed not in ("right", "left"):
+            raise ValueError(f"Unknown closed side: {closed}")
+
+        self.edges = edges
+        self.labels = list(labels)
+        self.closed = closed
+        self.dtype = pd.CategoricalDtype(self.labels, ordered=True)
+
+    def codes(self, values):
+        values = np.asarray(values, dtype=float)
+
+        side = "left" if self.closed == "right" else "right"
+        codes = np.searchsorted(self.edges, values, side=side)
+
+        codes[np.isnan(values)] = 0
+
+        return codes
+
+
+def assign_bands(values, bands):
+    """
+    Label a whole array / Series at once; returns categorical dtype
+    (a Series with the same index when given a Series).
+    """
+    labels = pd.Categorical.from_codes(bands.codes(values), dtype=bands.dtype)
+
+    if isinstance(values, pd.Series):
+        return pd.Series(labels, index=values.index, name=values.name)
+
+    return labels
+
+
+def classify_band(value, bands):
+    """
+    Scalar version of assign_bands.
+    """
+    return bands.labels[int(bands.codes([value])[0])]
+
+
+# ==========================
+# BAND DEFINITIONS
+# ==========================
+# Every classifier in the project reads its cutoffs from here.
+
+SEVERITY_BANDS = Bands(
+    [0.4, 0.6, 0.8],
+    ["LOW", "MODERATE", "HIGH", "CRITICAL"]
+)
+
+SEVERITY_COLOR_BANDS = Bands(
+    [0.4, 0.7, 1.0],
+    ["green", "orange", "red", "darkred"]
+)
+
+RISK_BANDS = Bands(
+    [0.4, 0.7, 1.0],
+    ["LOW", "MODERATE", "HIGH", "CRITICAL"]
+)
+
+ALERT_BANDS = Bands(
+    [0.3, 0.5, 0.75],
+    ["LOW", "MODERATE", "HIGH", "CRITICAL"],
+    closed="left"
+)
+
+MOMENTUM_BANDS = Bands(
+    [0.4, 0.7, 1.0],
+    ["LOW", "STABLE", "RISING", "SURGING"]
+)
+
+PROJECTION_BANDS = Bands(
+    [0.6, 0.9, 1.2],
+    ["MODERATE", "HIGH", "VERY HIGH", "EXTREME"]
+)
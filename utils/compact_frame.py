@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+CATEGORY_COLUMNS = ["state", "city", "station"]
+FLOAT32_COLUMNS = ["NO2", "PM10", "PM2.5", "latitude", "longitude"]
+
+PANDAS_MAJOR = int(pd.__version__.split(".")[0])
+
+
+def copy_on_write_enabled():
+    """
+    Always on from pandas 3.0; opt-in (mode.copy_on_write) on 2.x.
+    """
+    if PANDAS_MAJOR >= 3:
+        return True
+
+    return pd.get_option("mode.copy_on_write") is True
+
+
+def enable_copy_on_write():
+    """
+    Turn on pandas copy-on-write for the process (no-op on pandas 3).
+    Call once at an entry point (dashboard, batch worker).
+    """
+    if PANDAS_MAJOR < 3:
+        pd.set_option("mode.copy_on_write", True)
+
+
+def stage_frame(df):
+    """
+    Frame a stage may add columns to without touching the caller's.
+
+    Under copy-on-write this is a shallow copy: existing columns stay
+    shared and are only copied if the stage writes into them. Without
+    it, fall back to the old deep copy.
+    """
+    return df.copy(deep=not copy_on_write_enabled())
+
+
+def compact_dtypes(categories=CATEGORY_COLUMNS, floats=FLOAT32_COLUMNS):
+    """
+    dtype mapping for pd.read_csv, so the compact frame is parsed
+    directly instead of converted after a full-width read.
+    """
+    dtypes = {column: "category" for column in categories}
+    dtypes.update({column: np.float32 for column in floats})
+    return dtypes
+
+
+def compact_frame(df, categories=CATEGORY_COLUMNS, floats=FLOAT32_COLUMNS):
+    """
+    Low-memory copy of a station frame: state/city/station as categoricals
+    and pollutant / coordinate columns as float32.
+    """
+    conversions = {}
+
+    for column in categories:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            conversions[column] = "category"
+
+    for column in floats:
+        if column in df.columns and df[column].dtype != np.float32:
+            conversions[column] = np.float32
+
+    if not conversions:
+        return df
+
+    return df.astype(conversions)
+
+
+def frame_memory_bytes(df):
+    """
+    Memory held by a frame, including object string payloads.
+    """
+    return int(df.memory_usage(index=True, deep=True).sum())
@@ -0,0 +1,190 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+# tracemalloc is process-wide, so memory-profiled stages from different
+# profilers (e.g. two dashboard sessions) run one at a time
+_memory_lock = threading.RLock()
+
+
+def _rows(value):
+    """
+    Row count of a stage input/output (frames, or run_pipeline's dict).
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+
+    if isinstance(value, dict) and isinstance(value.get("frame"), pd.DataFrame):
+        return len(value["frame"])
+
+    return None
+
+
+class StageProfiler:
+    """
+    Records wall time, rows in/out and allocated memory per named stage.
+
+    memory=True uses tracemalloc (peak bytes allocated during the stage,
+    and net bytes still held after it); it slows Python-level allocation
+    noticeably, so keep it off for plain timing. The figures are
+    process-wide: allocations by other threads during a stage count
+    towards it. Tracing runs only inside a top-level stage and is
+    stopped when it exits, even on an exception or st.stop().
+
+    Stages may nest: an inner stage's peak counts towards the outer one.
+    Export with to_json() or to_chrome_trace() (chrome://tracing,
+    Perfetto).
+    """
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.records = []
+        self._origin = time.perf_counter()
+        self._stack = []
+        self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """
+        Time a block; set record["rows_out"] inside it if known.
+        """
+        record = {"stage": name, "rows_in": rows_in, "rows_out": None, "depth": len(self._stack)}
+        outermost = self.memory and not self._stack
+
+        if outermost:
+            _memory_lock.acquire()
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+
+        try:
+            with self._measure(record):
+                yield record
+        finally:
+            if outermost:
+                self.stop()
+                _memory_lock.release()
+
+    @contextmanager
+    def _measure(self, record):
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                # Keep the enclosing stage's peak before resetting it
+                self._stack[-1]["_peak"] = max(self._stack[-1]["_peak"], peak)
+            tracemalloc.reset_peak()
+            record["_base"] = current
+            record["_peak"] = current
+
+        self._stack.append(record)
+        start = time.perf_counter()
+
+        try:
+            yield record
+        finally:
+            end = time.perf_counter()
+            self._stack.pop()
+
+            record["start_seconds"] = start - self._origin
+            record["seconds"] = end - start
+            record["thread"] = threading.get_ident()
+
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, record.pop("_peak"))
+                base = record.pop("_base")
+                record["memory_peak_bytes"] = peak - base
+                record["memory_net_bytes"] = current - base
+
+                if self._stack:
+                    self._stack[-1]["_peak"] = max(self._stack[-1]["_peak"], peak)
+
+            self.records.append(record)
+
+    def call(self, name, func, *args, **kwargs):
+        """
+        Run func(*args, **kwargs) as a stage; rows are taken from the
+        first frame argument and from the result.
+        """
+        rows_in = next((r for r in map(_rows, [*args, *kwargs.values()]) if r is not None), None)
+
+        with self.stage(name, rows_in=rows_in) as record:
+            result = func(*args, **kwargs)
+            record["rows_out"] = _rows(result)
+
+        return result
+
+    def stop(self):
+        """
+        Stop tracemalloc if this profiler started it (top-level stages
+        already do this on exit).
+        """
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_tracing = False
+
+    def summary(self):
+        columns = ["stage", "seconds", "rows_in", "rows_out"]
+        if self.memory:
+            columns += ["memory_peak_bytes", "memory_net_bytes"]
+
+        return pd.DataFrame(self.records, columns=columns)
+
+    def report(self):
+        return {
+            "pid": os.getpid(),
+            "memory": self.memory,
+            "total_seconds": sum(r["seconds"] for r in self.records if r["depth"] == 0),
+            "stages": self.records,
+        }
+
+    def to_json(self, path=None):
+        text = json.dumps(self.report(), indent=2)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+    def chrome_trace(self):
+        """
+        Trace Event Format: one complete ("X") event per stage.
+        """
+        pid = os.getpid()
+        events = []
+
+        for record in self.records:
+            args = {k: v for k, v in record.items() if k not in ("stage", "start_seconds", "seconds", "thread", "depth")}
+            events.append({
+                "name": record["stage"],
+                "cat": "pipeline",
+                "ph": "X",
+                "ts": round(record["start_seconds"] * 1e6, 3),
+                "dur": round(record["seconds"] * 1e6, 3),
+                "pid": pid,
+                "tid": record["thread"],
+                "args": args,
+            })
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def to_chrome_trace(self, path=None):
+        text = json.dumps(self.chrome_trace())
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+
+def profiled(profiler, name, func, *args, **kwargs):
+    """
+    profiler.call(...) when profiling, a plain call otherwise.
+    """
+    if profiler is None:
+        return func(*args, **kwargs)
+
+    return profiler.call(name, func, *args, **kwargs)
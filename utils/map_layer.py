@@ -0,0 +1,182 @@
+import html
+
+import folium
+import numpy as np
+from folium.plugins import FastMarkerCluster
+from folium.utilities import JsCode
+
+from utils.banding import SEVERITY_COLOR_BANDS, assign_bands
+from utils.pipeline_cache import cached_stage
+
+# Above this many stations the map switches to client-side clustering
+CLUSTER_THRESHOLD = 2000
+
+LAYER_COLUMNS = ['state', 'city', 'latitude', 'longitude']
+
+# Styles come from each feature's properties in the browser, so the
+# map HTML does not carry a per-feature style table
+STYLE_FROM_PROPERTIES = JsCode("""
+function (feature, layer) {
+    layer.setStyle(feature.properties.style);
+}
+""")
+
+# Draws each clustered point as a styled circle marker in the browser
+CLUSTER_CALLBACK = """
+function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+        color: row[2], radius: row[3], fill: true
+    });
+    marker.bindPopup(row[4]);
+    return marker;
+};
+"""
+
+
+def _station_arrays(df, value_column):
+    """
+    Coordinates, rounded severity, colour and radius for every station
+    with valid coordinates, computed column-wise. Names are HTML-escaped:
+    both popups insert them into the page as markup.
+    """
+    df = df[LAYER_COLUMNS + [value_column]]
+    df = df[df['latitude'].notna() & df['longitude'].notna()]
+
+    values = df[value_column].to_numpy(dtype=float)
+
+    return {
+        "latitude": df['latitude'].to_numpy(dtype=float).tolist(),
+        "longitude": df['longitude'].to_numpy(dtype=float).tolist(),
+        "severity": np.round(values, 2).tolist(),
+        "radius": (5 + values * 15).tolist(),
+        "color": assign_bands(values, SEVERITY_COLOR_BANDS).astype(str).tolist(),
+        "city": [html.escape(name) for name in df['city'].astype(str)],
+        "state": [html.escape(name) for name in df['state'].astype(str)],
+    }
+
+
+@cached_stage(maxsize=16)
+def _station_geojson(df, value_column):
+    arrays = _station_arrays(df, value_column)
+
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [lon, lat]},
+            "properties": {
+                "city": city,
+                "state": state,
+                "severity": severity,
+                "style": {"color": color, "radius": radius, "fill": True}
+            }
+        }
+        for lat, lon, city, state, severity, color, radius in zip(
+            arrays["latitude"], arrays["longitude"],
+            arrays["city"], arrays["state"], arrays["severity"],
+            arrays["color"], arrays["radius"]
+        )
+    ]
+
+    return {"type": "FeatureCollection", "features": features}
+
+
+@cached_stage(maxsize=16)
+def _station_cluster_rows(df, value_column):
+    arrays = _station_arrays(df, value_column)
+
+    return [
+        [lat, lon, color, radius, f"City: {city}<br>State: {state}<br>Severity: {severity}"]
+        for lat, lon, color, radius, city, state, severity in zip(
+            arrays["latitude"], arrays["longitude"],
+            arrays["color"], arrays["radius"],
+            arrays["city"], arrays["state"], arrays["severity"]
+        )
+    ]
+
+
+def station_geojson(df, value_column="predicted_severity"):
+    """
+    One GeoJSON FeatureCollection for all stations, styles precomputed.
+    Cached on the map columns, so unchanged data is not rebuilt.
+    """
+    return _station_geojson(df[LAYER_COLUMNS + [value_column]], value_column)
+
+
+def add_station_layer(m, df, value_column="predicted_severity"):
+    """
+    Add every station to the map as a single layer: a styled GeoJSON
+    layer, or a client-side marker cluster for large station counts.
+    """
+    data = df[LAYER_COLUMNS + [value_column]]
+
+    if len(data) > CLUSTER_THRESHOLD:
+        FastMarkerCluster(
+            _station_cluster_rows(data, value_column),
+            callback=CLUSTER_CALLBACK,
+            name="Stations"
+        ).add_to(m)
+        return m
+
+    folium.GeoJson(
+        _station_geojson(data, value_column),
+        name="Stations",
+        marker=folium.CircleMarker(),
+        on_each_feature=STYLE_FROM_PROPERTIES,
+        popup=folium.GeoJsonPopup(
+            fields=["city", "state", "severity"],
+            aliases=["City:", "State:", "Severity:"]
+        )
+    ).add_to(m)
+
+    return m
+
+
+def cell_geojson(cells, value_column="predicted_severity"):
+    """
+    Spatial pyramid cells (SpatialPyramid.cells) as styled rectangles,
+    coloured by the cell mean.
+    """
+    means = cells[f"{value_column}_mean"].to_numpy(dtype=float)
+    colors = assign_bands(means, SEVERITY_COLOR_BANDS).astype(str).tolist()
+
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {
+                "type": "Polygon",
+                "coordinates": [[[w, s], [e, s], [e, n], [w, n], [w, s]]]
+            },
+            "properties": {
+                "mean": round(mean, 3),
+                "max": round(peak, 3),
+                "stations": count,
+                "style": {"color": color, "weight": 1, "fillColor": color, "fillOpacity": 0.5}
+            }
+        }
+        for s, w, n, e, mean, peak, count, color in zip(
+            cells["south"].tolist(), cells["west"].tolist(),
+            cells["north"].tolist(), cells["east"].tolist(),
+            means.tolist(), cells[f"{value_column}_max"].tolist(),
+            cells[f"{value_column}_count"].tolist(), colors
+        )
+    ]
+
+    return {"type": "FeatureCollection", "features": features}
+
+
+def add_cell_layer(m, cells, value_column="predicted_severity"):
+    """
+    Add aggregated cells instead of individual stations (low zoom,
+    nationwide views): one feature per cell however many stations.
+    """
+    folium.GeoJson(
+        cell_geojson(cells, value_column),
+        name="Cells",
+        on_each_feature=STYLE_FROM_PROPERTIES,
+        popup=folium.GeoJsonPopup(
+            fields=["mean", "max", "stations"],
+            aliases=["Mean severity:", "Max severity:", "Readings:"]
+        )
+    ).add_to(m)
+
+    return m
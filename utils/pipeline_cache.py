@@ -0,0 +1,155 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+
+
+def frame_signature(df):
+    """
+    Content hash of a DataFrame / Series (values, index, columns, dtypes).
+    Two frames with the same signature produce the same stage output.
+    """
+    row_hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+
+    digest = hashlib.blake2b(row_hashes.tobytes(), digest_size=16)
+
+    if isinstance(df, pd.DataFrame):
+        digest.update(repr(list(df.columns)).encode())
+        digest.update(repr([str(t) for t in df.dtypes]).encode())
+    else:
+        digest.update(repr((df.name, str(df.dtype))).encode())
+
+    return digest.hexdigest()
+
+
+def make_key(value):
+    """
+    Turn stage arguments into a hashable cache key.
+    Frames and arrays are reduced to a content hash.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return ("frame", frame_signature(value))
+
+    if isinstance(value, np.ndarray):
+        digest = hashlib.blake2b(np.ascontiguousarray(value).tobytes(), digest_size=16)
+        return ("array", value.shape, str(value.dtype), digest.hexdigest())
+
+    if isinstance(value, dict):
+        return ("dict", tuple(sorted((k, make_key(v)) for k, v in value.items())))
+
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(make_key(v) for v in value))
+
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return ("repr", repr(value))
+
+
+class StageCache:
+    """
+    Bounded LRU cache shared by every session in the process.
+
+    maxbytes additionally caps the summed nbytes of the cached values
+    (values without an nbytes attribute count as 0); the newest entry
+    is always kept, even when it alone is over the cap.
+    """
+
+    def __init__(self, maxsize=32, maxbytes=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            if key in self._data:
+                self.nbytes -= _nbytes(self._data[key])
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self.nbytes += _nbytes(value)
+
+            while len(self._data) > 1 and (
+                len(self._data) > self.maxsize or
+                (self.maxbytes is not None and self.nbytes > self.maxbytes)
+            ):
+                _, evicted = self._data.popitem(last=False)
+                self.nbytes -= _nbytes(evicted)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "nbytes": self.nbytes,
+            "maxbytes": self.maxbytes
+        }
+
+
+def _nbytes(value):
+    return getattr(value, "nbytes", 0)
+
+
+_MISSING = object()
+
+
+def cached_stage(maxsize=32):
+    """
+    Memoize a pipeline stage on a hash of its input frame and parameters.
+
+    Cached results are shared between callers, so they must be treated
+    as read-only (every stage in the pipeline copies its input first).
+    """
+
+    def decorator(func):
+        cache = StageCache(maxsize=maxsize)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (make_key(args), make_key(kwargs))
+
+            result = cache.get(key, _MISSING)
+            if result is _MISSING:
+                result = func(*args, **kwargs)
+                cache.put(key, result)
+
+            return result
+
+        wrapper.cache = cache
+        wrapper.cache_clear = cache.clear
+        wrapper.cache_info = cache.info
+
+        return wrapper
+
+    return decorator
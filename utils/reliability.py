@@ -1,5 +1,7 @@
-import pandas as pd
+import threading
+
 import numpy as np
+import pandas as pd
 
 def calculate_reliability(df):
     """
@@ -24,4 +26,235 @@ def calculate_reliability(df):
     # Final weighted score
     reliability_score = (0.7 * completeness_score) + (0.3 * stability_score)
 
-    return round(reliability_score, 4)
\ No newline at end of file
+    return round(reliability_score, 4)
+
+POLLUTANTS = ['PM2.5', 'PM10', 'NO2']
+
+# Stability of a station with too few readings to have a spread is
+# shrunk towards a prior: how typical its mean level is of the network
+# (1 / (1 + relative distance from the mean of all stations' means)),
+# so a lone outlying reading is trusted less than one in line with its
+# peers. STABILITY_PRIOR_READINGS is how many readings beyond the first
+# the station's own spread needs to weigh half; a pollutant a station
+# never reported falls back to NEUTRAL_STABILITY.
+NEUTRAL_STABILITY = 0.5
+STABILITY_PRIOR_READINGS = 2
+
+
+class StreamingReliability:
+    """
+    Online reliability per station.
+
+    For every station and pollutant it keeps a running count of expected
+    vs present readings (completeness) and a Welford mean / variance
+    (stability). Stability uses the coefficient of variation, so it does
+    not collapse for pollutants measured in the hundreds. A single
+    reading says nothing about its own stability, so it is blended with
+    a prior (how typical the station's level is of the network) until
+    a station has a few readings.
+
+    half_life (in readings) turns on exponential time decay, so old
+    readings count half as much after half_life newer ones. Per-station
+    and aggregate scores are O(1) to query.
+    """
+
+    def __init__(self, pollutants=POLLUTANTS, half_life=None):
+        self.pollutants = list(pollutants)
+        self.decay = 0.5 ** (1 / half_life) if half_life else 1.0
+
+        self._ids = {}
+        self._labels = []
+        self._size = 0
+
+        n = len(self.pollutants)
+        self._expected = np.zeros((0, n))
+        self._present = np.zeros((0, n))
+        self._mean = np.zeros((0, n))
+        self._m2 = np.zeros((0, n))
+        self._scores = np.zeros(0)
+        self._score_sum = 0.0
+
+    def _station_ids(self, stations):
+        ids = np.empty(len(stations), dtype=np.int64)
+
+        for i, station in enumerate(stations):
+            if station not in self._ids:
+                self._ids[station] = len(self._labels)
+                self._labels.append(station)
+            ids[i] = self._ids[station]
+
+        needed = len(self._labels)
+        if needed > len(self._scores):
+            capacity = max(needed, 2 * len(self._scores), 64)
+            grow = capacity - len(self._scores)
+            pad = np.zeros((grow, len(self.pollutants)))
+            self._expected = np.vstack([self._expected, pad])
+            self._present = np.vstack([self._present, pad])
+            self._mean = np.vstack([self._mean, pad])
+            self._m2 = np.vstack([self._m2, pad])
+            self._scores = np.concatenate([self._scores, np.zeros(grow)])
+
+        self._size = needed
+        return ids
+
+    def update(self, stations, values):
+        """
+        Add a batch of readings: stations is a sequence of station keys,
+        values an (n, pollutants) array with NaN for missing readings.
+        Batches are merged with the parallel Welford update; with decay,
+        a station's history is decayed once per new reading.
+        """
+        values = np.asarray(values, dtype=float).reshape(len(stations), len(self.pollutants))
+
+        inverse, unique = pd.factorize(pd.Index(stations))
+        ids = self._station_ids(list(unique))
+
+        k = len(unique)
+        present = ~np.isnan(values)
+        filled = np.where(present, values, 0.0)
+
+        # Batch statistics per station and pollutant
+        batch_rows = np.bincount(inverse, minlength=k).astype(float)
+        batch_n = np.zeros((k, len(self.pollutants)))
+        batch_sum = np.zeros_like(batch_n)
+        for p in range(len(self.pollutants)):
+            batch_n[:, p] = np.bincount(inverse, weights=present[:, p], minlength=k)
+            batch_sum[:, p] = np.bincount(inverse, weights=filled[:, p], minlength=k)
+
+        batch_mean = np.divide(batch_sum, batch_n, out=np.zeros_like(batch_sum), where=batch_n > 0)
+
+        deviation = np.where(present, values - batch_mean[inverse], 0.0)
+        batch_m2 = np.zeros_like(batch_n)
+        for p in range(len(self.pollutants)):
+            batch_m2[:, p] = np.bincount(inverse, weights=deviation[:, p] ** 2, minlength=k)
+
+        # Decay existing history, then merge (Chan et al. parallel update)
+        fade = (self.decay ** batch_rows)[:, None]
+
+        old_n = self._present[ids] * fade
+        old_mean = self._mean[ids]
+        old_m2 = self._m2[ids] * fade
+
+        total_n = old_n + batch_n
+        delta = batch_mean - old_mean
+        share = np.divide(batch_n, total_n, out=np.zeros_like(total_n), where=total_n > 0)
+
+        self._mean[ids] = old_mean + delta * share
+        self._m2[ids] = old_m2 + batch_m2 + delta ** 2 * old_n * share
+        self._present[ids] = total_n
+        self._expected[ids] = self._expected[ids] * fade + batch_rows[:, None]
+
+        # The network mean moved, so every station's prior did too
+        self._refresh_scores(np.arange(self._size))
+
+        return self
+
+    def update_frame(self, df, key="city"):
+        keys = [key] if isinstance(key, str) else list(key)
+
+        if len(keys) == 1:
+            stations = df[keys[0]].tolist()
+        else:
+            stations = list(df[keys].itertuples(index=False, name=None))
+
+        return self.update(stations, df[self.pollutants].to_numpy(dtype=float))
+
+    def _refresh_scores(self, ids):
+        completeness = np.divide(
+            self._present[ids], self._expected[ids],
+            out=np.zeros_like(self._present[ids]), where=self._expected[ids] > 0
+        ).mean(axis=1)
+
+        variance = np.divide(
+            self._m2[ids], self._present[ids],
+            out=np.zeros_like(self._m2[ids]), where=self._present[ids] > 0
+        )
+        mean = np.abs(self._mean[ids])
+        cv = np.divide(
+            np.sqrt(variance), mean,
+            out=np.full_like(mean, np.inf), where=mean > 0
+        )
+        evidence = np.clip(self._present[ids] - 1, 0, None)
+        weight = evidence / (evidence + STABILITY_PRIOR_READINGS)
+        stability = (
+            weight * (1 / (1 + cv)) + (1 - weight) * self._prior(ids)
+        ).mean(axis=1)
+
+        scores = (0.7 * completeness) + (0.3 * stability)
+
+        self._score_sum += scores.sum() - self._scores[ids].sum()
+        self._scores[ids] = scores
+
+    def _prior(self, ids):
+        reported = self._present[:self._size] > 0
+        counts = reported.sum(axis=0)
+        network = np.divide(
+            np.where(reported, self._mean[:self._size], 0.0).sum(axis=0), counts,
+            out=np.zeros(len(self.pollutants)), where=counts > 0
+        )
+
+        distance = np.divide(
+            np.abs(self._mean[ids] - network), np.abs(network),
+            out=np.zeros_like(self._mean[ids]), where=network != 0
+        )
+        return np.where(self._present[ids] > 0, 1 / (1 + distance), NEUTRAL_STABILITY)
+
+    def station_score(self, station):
+        return round(float(self._scores[self._ids[station]]), 4)
+
+    def aggregate_score(self):
+        if self._size == 0:
+            return 0.0
+        return round(self._score_sum / self._size, 4)
+
+    def scores(self, name="reliability"):
+        index = (
+            pd.MultiIndex.from_tuples(self._labels)
+            if self._labels and isinstance(self._labels[0], tuple)
+            else pd.Index(self._labels)
+        )
+        return pd.Series(self._scores[:self._size].round(4), index=index, name=name)
+
+
+# One engine per (key, half_life), fed only readings it has not seen
+# (identified by a hash of key, date and pollutant values), as
+# live_ingest feeds its own engine new rows only
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def calculate_station_reliability(df, key=("state", "city"), half_life=None):
+    """
+    Per-station reliability for a frame (Series indexed by key).
+
+    Readings accumulate in a process-wide engine across calls, so a
+    station's score reflects every reading seen for it so far; call
+    clear_reliability_cache() to start over.
+    """
+    keys = [key] if isinstance(key, str) else list(key)
+    columns = keys + [c for c in ["date"] + POLLUTANTS if c in df.columns]
+
+    with _engines_lock:
+        engine, seen = _engines.setdefault(
+            (tuple(keys), half_life), (StreamingReliability(half_life=half_life), set())
+        )
+
+        row_hashes = pd.util.hash_pandas_object(df[columns], index=False)
+        new = ~row_hashes.isin(seen) & ~row_hashes.duplicated()
+        if new.any():
+            engine.update_frame(df[new.to_numpy()], key=keys)
+            seen.update(row_hashes[new].tolist())
+
+        scores = engine.scores()
+
+    scores.index.names = keys
+    stations = pd.MultiIndex.from_frame(df[keys]) if len(keys) > 1 else pd.Index(df[keys[0]], name=keys[0])
+    return scores.loc[stations.unique()]
+
+
+def clear_reliability_cache():
+    """
+    Drop every accumulated reliability engine.
+    """
+    with _engines_lock:
+        _engines.clear()
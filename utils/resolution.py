@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+from utils.banding import MOMENTUM_BANDS, PROJECTION_BANDS, RISK_BANDS, SEVERITY_BANDS, assign_bands
+from utils.pipeline_cache import cached_stage
+
+CITY_KEY = ["state", "city"]
+STATION_KEY = ["state", "city", "station"]
+
+# How a station column becomes the city value for a date. Columns not
+# listed (e.g. station, which `stations` replaces) are not carried into
+# the city view.
+CITY_AGGREGATIONS = {
+    # Readings and everything linear in them: the station mean
+    "PM2.5": "mean",
+    "PM10": "mean",
+    "NO2": "mean",
+    "pm25_norm": "mean",
+    "pm10_norm": "mean",
+    "no2_norm": "mean",
+    "severity_index": "mean",
+    "risk_score": "mean",
+    "spread_impact": "mean",
+    "predicted_severity": "mean",
+    "risk_momentum": "mean",
+    "projected_7day_severity": "mean",
+    # Station centroid
+    "latitude": "mean",
+    "longitude": "mean",
+    # Slopes are linear in the readings too (exact when the stations
+    # report on the same days)
+    "momentum_slope": "mean",
+    "momentum_acceleration": "mean",
+    # A ratio does not average; the median station's
+    "momentum_roc": "median",
+    # Over the stations with a fitted forecast (NaN where none was)
+    "forecast_growth_7day": "mean",
+    # Nearest station to the source; a band covering every station's
+    "distance_from_source": "min",
+    "projected_7day_lower": "min",
+    "projected_7day_upper": "max",
+}
+
+# Label columns are re-derived from the reduced value, not averaged
+BAND_COLUMNS = {
+    "severity_label": ("predicted_severity", SEVERITY_BANDS),
+    "alert_level": ("risk_score", RISK_BANDS),
+    "momentum_level": ("risk_momentum", MOMENTUM_BANDS),
+    "projected_alert": ("projected_7day_severity", PROJECTION_BANDS),
+}
+
+
+def entity_key(df):
+    """
+    Columns identifying one series in a frame: station rows when the
+    frame has a station column, cities otherwise.
+    """
+    return STATION_KEY if "station" in df.columns else CITY_KEY
+
+
+def reduce_to_city(df, date_column="date"):
+    """
+    City-level view of a station-level frame (inputs or pipeline
+    results): each column is reduced over a city's stations per date as
+    CITY_AGGREGATIONS says, momentum_factor is re-derived from the
+    reduced risk_momentum, `stations` counts them and band labels are
+    recomputed. City frames pass through.
+
+    Cached on the frame's content, so serving the city view of an
+    already computed station run is a lookup.
+    """
+    if "station" not in df.columns:
+        return df
+
+    return _reduce_to_city(df, date_column)
+
+
+@cached_stage(maxsize=32)
+def _reduce_to_city(df, date_column):
+    keys = CITY_KEY + ([date_column] if date_column in df.columns else [])
+
+    aggregations = {
+        column: how for column, how in CITY_AGGREGATIONS.items()
+        if column in df.columns and column not in keys
+    }
+
+    grouped = df.groupby(keys, sort=False, observed=True)
+
+    city = grouped.agg(aggregations) if aggregations else pd.DataFrame(index=grouped.size().index)
+
+    # risk_momentum = predicted_severity x momentum_factor, per city too
+    if {"momentum_factor", "risk_momentum", "predicted_severity"} <= set(df.columns):
+        predicted = city["predicted_severity"].to_numpy(dtype=float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            city["momentum_factor"] = np.where(
+                predicted > 0, city["risk_momentum"].to_numpy(dtype=float) / predicted, 1.0
+            )
+
+    # Keep the station frame's column order
+    city = city[[column for column in df.columns if column in city.columns]]
+    city["stations"] = grouped.size()
+    city = city.reset_index()
+
+    for label, (column, bands) in BAND_COLUMNS.items():
+        if label in df.columns and column in city.columns:
+            city[label] = assign_bands(city[column], bands)
+
+    return city
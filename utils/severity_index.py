@@ -1,5 +1,7 @@
 import pandas as pd
 
+from utils.compact_frame import stage_frame
+
 def normalize_column(series):
     """Min-Max normalization"""
     return (series - series.min()) / (series.max() - series.min())
@@ -10,7 +12,7 @@ def calculate_severity_index(df):
     Returns dataframe with new column: severity_index
     """
 
-    df = df.copy()
+    df = stage_frame(df)
 
     # Normalize pollutants
     df['PM2.5_norm'] = normalize_column(df['PM2.5'])
@@ -1,38 +1,116 @@
 import pandas as pd
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
 
-def estimate_pollution_source(df):
+from utils.pipeline_cache import StageCache, make_key
 
-    if 'latitude' not in df.columns or 'longitude' not in df.columns:
-        raise ValueError("Latitude and Longitude columns are required")
+# Above this many stations MiniBatchKMeans replaces a full KMeans fit
+MINIBATCH_THRESHOLD = 50_000
+
+# Fitted clusterings per exact coordinate set (clustering only looks at
+# lat/long, so new severity values never need a refit). Fits are seeded,
+# so a cache hit returns exactly what a refit would; no state carries
+# over between different coordinate sets.
+_fit_cache = StageCache(maxsize=64)
 
-    data = df[['latitude', 'longitude', 'severity_index']].dropna()
+
+def estimate_pollution_source(df, n_clusters=3):
+
+    sources = estimate_pollution_sources(df, n_clusters=n_clusters)
 
     # CASE 1: No data at all
-    if len(data) == 0:
+    if len(sources) == 0:
         return {
             "source_latitude": None,
             "source_longitude": None
         }
 
-    # CASE 2: Too few rows for clustering
-    if len(data) < 3:
-        max_row = data.loc[data['severity_index'].idxmax()]
-        return {
-            "source_latitude": round(max_row['latitude'], 5),
-            "source_longitude": round(max_row['longitude'], 5)
+    return {
+        "source_latitude": sources[0]["source_latitude"],
+        "source_longitude": sources[0]["source_longitude"],
+        "clusters": sources
+    }
+
+
+def estimate_pollution_sources(df, n_clusters=3):
+    """
+    Returns every KMeans cluster as a candidate source,
+    ranked by mean severity (worst first).
+    """
+
+    if 'latitude' not in df.columns or 'longitude' not in df.columns:
+        raise ValueError("Latitude and Longitude columns are required")
+
+    data = df[['latitude', 'longitude', 'severity_index']].dropna()
+
+    if len(data) == 0:
+        return []
+
+    # Too few rows for clustering: every row is its own source
+    if len(data) < n_clusters:
+        data = data.sort_values('severity_index', ascending=False, kind='stable')
+        return [
+            {
+                "source_latitude": round(row['latitude'], 5),
+                "source_longitude": round(row['longitude'], 5),
+                "mean_severity": row['severity_index'],
+                "stations": 1
+            }
+            for _, row in data.iterrows()
+        ]
+
+    # Normal clustering
+    centers, labels = fit_station_clusters(
+        data[['latitude', 'longitude']].to_numpy(),
+        n_clusters
+    )
+    data['cluster'] = labels
+
+    cluster_stats = data.groupby('cluster')['severity_index'].agg(['mean', 'size'])
+    cluster_stats = cluster_stats.sort_values('mean', ascending=False, kind='stable')
+
+    return [
+        {
+            "source_latitude": round(centers[cluster][0], 5),
+            "source_longitude": round(centers[cluster][1], 5),
+            "mean_severity": cluster_stats.loc[cluster, 'mean'],
+            "stations": int(cluster_stats.loc[cluster, 'size'])
         }
+        for cluster in cluster_stats.index
+    ]
 
-    # CASE 3: Normal clustering
-    kmeans = KMeans(n_clusters=3, random_state=42)
-    data['cluster'] = kmeans.fit_predict(data[['latitude', 'longitude']])
 
-    cluster_severity = data.groupby('cluster')['severity_index'].mean()
-    highest_cluster = cluster_severity.idxmax()
+def fit_station_clusters(coords, n_clusters):
+    """
+    Cluster station coordinates, reusing earlier work where possible:
 
-    centroid = kmeans.cluster_centers_[highest_cluster]
+    - same coordinates as a previous call: cached centroids and labels
+    - large inputs: MiniBatchKMeans(random_state=42)
+    - otherwise: the original KMeans(random_state=42) fit
 
-    return {
-        "source_latitude": round(centroid[0], 5),
-        "source_longitude": round(centroid[1], 5)
-    }
\ No newline at end of file
+    Every fit is seeded and starts from scratch, so identical input gives
+    identical centroids whatever was fitted before.
+    """
+    fit_key = (make_key(coords), n_clusters)
+
+    cached = _fit_cache.get(fit_key)
+    if cached is not None:
+        return cached
+
+    if len(coords) > MINIBATCH_THRESHOLD:
+        model = MiniBatchKMeans(n_clusters=n_clusters, random_state=42, n_init=3)
+    else:
+        model = KMeans(n_clusters=n_clusters, random_state=42)
+
+    labels = model.fit_predict(coords)
+    result = (model.cluster_centers_, labels)
+
+    _fit_cache.put(fit_key, result)
+
+    return result
+
+
+def clear_source_cache():
+    """
+    Forget cached fits.
+    """
+    _fit_cache.clear()
@@ -1,23 +1,79 @@
+import re
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
 
-def classify_urban_rural(df):
+from utils.compact_frame import stage_frame
+
+# Major known metros treated as Urban (substring, case-insensitive)
+URBAN_KEYWORDS = ['Delhi', 'Mumbai', 'Kolkata', 'Chennai', 'Bengaluru', 'Hyderabad', 'Pune', 'Ahmedabad']
+
+AREA_TYPES = pd.CategoricalDtype(["Urban", "Rural"])
+
+# city -> is urban, per keyword set; cities repeat on every date, so
+# each distinct name is matched once per process
+_city_cache = {}
+_CITY_CACHE_LIMIT = 100_000
+
+
+def register_urban_keywords(*keywords):
+    """
+    Extend the default metro / keyword list.
+    """
+    for keyword in keywords:
+        if keyword not in URBAN_KEYWORDS:
+            URBAN_KEYWORDS.append(keyword)
+
+
+@lru_cache(maxsize=16)
+def _compile_matcher(keywords):
+    return re.compile("|".join(re.escape(k) for k in keywords), re.IGNORECASE)
+
+
+def classify_cities(cities, keywords=None):
+    """
+    Urban/Rural label for every entry of `cities` (categorical).
+    Only distinct city names are matched, with one precompiled pattern.
+    """
+    keywords = tuple(URBAN_KEYWORDS if keywords is None else keywords)
+
+    matcher = _compile_matcher(keywords)
+
+    cache = _city_cache.setdefault(keywords, {})
+    if len(cache) > _CITY_CACHE_LIMIT:
+        cache.clear()
+
+    if not hasattr(cities, "dtype"):
+        cities = pd.Series(cities, dtype=object)
+
+    codes, uniques = pd.factorize(cities)
+
+    is_urban = np.empty(len(uniques), dtype=bool)
+    for i, city in enumerate(uniques):
+        urban = cache.get(city)
+        if urban is None:
+            urban = cache[city] = matcher.search(str(city)) is not None
+        is_urban[i] = urban
+
+    # Category codes: 0 = Urban, 1 = Rural. The trailing Rural entry is
+    # picked up by factorize's -1 code for missing cities.
+    unique_codes = np.append(np.where(is_urban, 0, 1), 1)
+    label_codes = unique_codes[codes]
+
+    return pd.Categorical.from_codes(label_codes, dtype=AREA_TYPES)
+
+
+def classify_urban_rural(df, keywords=None):
     """
     Simple classification logic:
     Cities containing 'Nagar', 'Puram', 'Patti' treated as semi/rural
     Major known metros treated as Urban
     """
 
-    urban_keywords = ['Delhi', 'Mumbai', 'Kolkata', 'Chennai', 'Bengaluru', 'Hyderabad', 'Pune', 'Ahmedabad']
-
-    df = df.copy()
-
-    def classify(city):
-        for metro in urban_keywords:
-            if metro.lower() in city.lower():
-                return "Urban"
-        return "Rural"
+    df = stage_frame(df)
 
-    df['area_type'] = df['city'].apply(classify)
+    df['area_type'] = classify_cities(df['city'], keywords)
 
     return df
 
@@ -27,8 +83,8 @@ def compare_urban_rural(df):
     Compare predicted severity between Urban and Rural
     """
 
-    summary = df.groupby('area_type')['predicted_severity'].mean().reset_index()
+    summary = df.groupby('area_type', observed=True)['predicted_severity'].mean().reset_index()
 
     summary = summary.sort_values(by='predicted_severity', ascending=False)
 
-    return summary
\ No newline at end of file
+    return summary